@@ -13,32 +13,253 @@ Improvements v2:
 """
 
 import argparse
+import http.client
 import json
 import math
 import os
+import queue
+import random
 import re
 import sys
+import threading
 import time
-import urllib.request
 import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+# Sibling modules (weather_elements, notam_checker) resolve from the script dir
+_SCRIPT_DIR = str(Path(__file__).parent)
+if _SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPT_DIR)
+
 from weather_elements import (
     WeatherCollection, parse_metar_elements, parse_taf_elements,
     parse_warning_elements, parse_pirep_elements,
-    PHASE_SOURCES, ALTERNATE_SOURCES, format_element_value
+    PHASE_SOURCES, ALTERNATE_SOURCES, COVERAGE_RANK, format_element_value
 )
 
 # TAF cache configuration
 TAF_CACHE_DIR = "/tmp/flyingphase_taf_cache"
 TAF_CACHE_EXPIRY_SECS = 1800  # 30 minutes
+# In-process TAF cache: ICAO -> (timestamp, raw TAF). Same expiry as disk.
+_TAF_MEM_CACHE: Dict[str, Tuple[float, str]] = {}
+# In-process parsed TAFs: ICAO -> TAFParser, valid while its raw text matches
+_TAF_PARSED_MEM_CACHE: Dict[str, 'TAFParser'] = {}
+# Format of the parsed-TAF sidecar. Bump whenever TAFParser's period dicts
+# change so parses written by older code are re-parsed instead of served.
+TAF_PARSED_SCHEMA_VERSION = 1
+
+# Alternates evaluated concurrently per batch; later batches only run if
+# no earlier alternate was suitable
+ALTERNATE_BATCH_SIZE = 2
+
+# Parsed + normalised airfield_data.json: path -> (mtime, data)
+_AIRFIELD_DATA_CACHE: Dict[str, Tuple[float, dict]] = {}
+
+# notam_checker module, imported on first NOTAM use (see _notam_module())
+_NOTAM_MODULE = None
+
+# Local time (AST, Saudi Arabia) is UTC+3 year-round
+UTC_OFFSET_HOURS = 3
+
+# --sortie-time: local HHmm, 0000-2359
+_HHMM_RE = re.compile(r'^([01]\d|2[0-3])([0-5]\d)$')
+
+# Closed-runway lists from NOTAMs: "17R/35L", "17R, 35L"
+_RWY_SPLIT_RE = re.compile(r'\s*[/,]\s*')
+
+# Service-impact warning line (apply_service_impacts)
+_SERVICE_WARN_FMT = '🔧 {service}: {action} ({ref})'
+
+# main() collects warnings as (code, params) and renders text only for output
+_WARN_FMT = {
+    'oekf_vis_low': 'OEKF visibility below VFR minimums ({km:.1f}km)',
+    'oekf_ceiling_low': 'OEKF ceiling below VFR minimums ({ft}ft)',
+    'oekf_cb': 'OEKF CB/TS reported or forecast',
+    'bird_moderate': '🐦 Bird-Strike Risk: MODERATE — phase capped at VFR, no solo ops',
+    'bird_severe': '🐦 Bird-Strike Risk: SEVERE — NO TAKE-OFFS, straight-in recovery only',
+    'service': '{text}',  # Already formatted by apply_service_impacts()
+    'weather_warning': 'Weather warning: {text}',
+    'sortie_deteriorating': '📅 Conditions expected to deteriorate during sortie window ({time}L)',
+    'sortie_cb': '📅 CB forecast during sortie window ({time}L)',
+}
+
+# HTTP retry policy for transient upstream errors
+HTTP_RETRY_TOTAL = 3
+HTTP_RETRY_BACKOFF_SECS = 0.6  # 0.6s, 1.2s, 2.4s
+HTTP_RETRY_JITTER_SECS = 0.2   # Random spread so parallel probes don't retry in lockstep
+HTTP_RETRY_MAX_SLEEP_SECS = 3.0
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Primary + fallback TAF endpoints ({} = ICAO)
+_TAF_URLS = (
+    "https://aviationweather.gov/api/data/taf?ids={}&format=raw",
+    "https://aviationweather.gov/api/data/taf?ids={}&format=raw&taf=true",
+)
+
+# Idle keep-alive connections per (scheme, host), shared by the probe threads
+# so later fetches (aliases, alternates, retries) skip the TCP+TLS handshake.
+# Only used for direct connections; proxied hosts and redirects go via urllib.
+HTTP_POOL_MAXSIZE = 4
+_HTTP_REDIRECT_STATUS = (301, 302, 303, 307, 308)
+# A pooled connection the server has closed while idle fails with one of these
+_HTTP_STALE_CONN_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                           ConnectionAbortedError, BrokenPipeError)
+_HTTP_POOL: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+_HTTP_POOL_LOCK = threading.Lock()
+_HTTP_USER_AGENT = f'Python-urllib/{sys.version_info[0]}.{sys.version_info[1]}'
+
+# Cloud coverages that form a ceiling (_cloud_summary ranks via COVERAGE_RANK)
+_BKN_OVC = frozenset(('BKN', 'OVC'))
+
+# Header emoji per phase (format_output)
+PHASE_EMOJI = {
+    'UNRESTRICTED': '🟢',
+    'RESTRICTED': '🟡',
+    'FS VFR': '🟡',
+    'VFR': '🟠',
+    'IFR': '🔴',
+    'HOLD': '⛔',
+    'HOLD/RECALL': '⛔🚨',
+    'RECALL': '🚨'
+}
+
+# Pass/fail marks for checks, indexed by bool (False → ❌, True → ✅)
+_CHECK_EMOJI = ('❌', '✅')
+
+# LOP Table 5-4 VMC tiers, most permissive first:
+# (phase, min vis km, cloud base AMSL ft, max cover above base, max wind kt,
+#  max crosswind kt, max tailwind kt, restrictions)
+# Cloud bases are AMSL and converted to AGL with the airfield elevation
+# (e.g. 8000ft AMSL = 5930ft AGL at OEKF). VFR/IFR are ceiling-based and
+# handled separately in _evaluate_phase_tiers().
+PHASE_TABLE = (
+    ('UNRESTRICTED', 8, 8000, 'FEW', 25, 15, 5,
+     {'solo_cadets': True, 'first_solo': True}),
+    ('RESTRICTED', 8, 6000, 'SCT', 25, 15, 5,
+     {'solo_cadets': True, 'solo_note': 'Post-IIC only', 'first_solo': True}),
+    ('FS VFR', 5, 5000, None, 25, 15, 5,
+     {'solo_cadets': False, 'solo_note': 'Not authorized', 'first_solo': True}),
+)
+
+# Static check labels per PHASE_TABLE row: (vis, wind, crosswind, tailwind).
+# Only the cloud labels depend on airfield elevation, so only they are formatted per call
+_PHASE_TIER_LABELS = tuple(
+    (f'Vis ≥ {min_vis_km}km', f'Total wind ≤ {max_wind}kt',
+     f'Crosswind ≤ {max_xwind}kt', f'Tailwind ≤ {max_tail}kt')
+    for _, min_vis_km, _, _, max_wind, max_xwind, max_tail, _ in PHASE_TABLE
+)
+
+# VFR/IFR: no solo flying (shared; callers copy)
+_INSTRUMENT_RESTRICTIONS = {'solo_cadets': False, 'first_solo': False}
+
+# Weather phases, most → least permissive (format_output's failed-tier listing)
+_PHASE_ORDER = tuple(row[0] for row in PHASE_TABLE) + ('VFR', 'IFR')
+
+# Phase severity for service impacts (higher = more restrictive)
+_SERVICE_PHASE_RANK = {'RECALL': 6, 'HOLD/RECALL': 6, 'HOLD': 5, 'IFR': 4, 'VFR': 3,
+                       'FS VFR': 2, 'RESTRICTED': 1, 'UNRESTRICTED': 0}
+
+# Solo-capable phases (the VMC tiers above); birds/services cap these at VFR
+_SOLO_PHASES = frozenset(row[0] for row in PHASE_TABLE)
+
+# Below IFR minimums (or VFR/IFR wind limits exceeded)
+_HOLD_RESTRICTIONS = {'solo_cadets': False, 'first_solo': False, 'note': 'Recover only - no takeoffs'}
+
+# NOTAM impact flags that only add an alternate warning: (key, value that
+# triggers it, warning). ILS/VOR outages are judged per approach in
+# check_alternate_suitability() and are not listed here.
+_NOTAM_WARNING_TABLE = (
+    ('bird_activity', True, 'NOTAM: Bird activity reported'),
+)
+
+# CB remark pattern: "CB NW MOV E", "CB DSNT SW", "CB OHD MOV NE", "CB NW-N 25NM"
+# Compass points are factored into character classes ([NS][EW]? tries NW
+# before N) so each direction is one or two class tests, not an 11-way scan
+_CB_DIRECTIONS = r'(?:[NS][EW]?|[EW]|OHD|DSNT|VC)'
+_CB_DETAIL_RE = re.compile(
+    r'\bCB\s+(?P<loc>' + _CB_DIRECTIONS + r'(?:[-/]' + _CB_DIRECTIONS + r')?)'
+    r'(?:\s+(?P<dist>\d+)\s*NM)?'
+    r'(?:\s+MOV\s+(?P<mov>' + _CB_DIRECTIONS + r'))?',
+    re.IGNORECASE
+)
+
+# Sort key for cloud layer dicts, and a getter for the two fields hot loops read
+_HEIGHT_KEY = itemgetter('height_ft')
+_COVERAGE_HEIGHT = itemgetter('coverage', 'height_ft')
+
+# METAR token patterns (matched against whole, upper-cased tokens)
+_CLEAR_SKY_CODES = frozenset({'NSC', 'SKC', 'NCD', 'CLR'})
+# Whole-token section keywords: observation ends at the first one
+_METAR_SECTION_RE = re.compile(r'(?<!\S)(?:RMK|NOSIG|TEMPO|BECMG)(?!\S)')
+_METAR_RMK_RE = re.compile(r'(?<!\S)RMK(?!\S)')
+_METAR_WIND_RE = re.compile(r'^(\d{3}|VRB)(\d{2,3})(G(\d{2,3}))?KT$')
+_METAR_VIS_SM_RE = re.compile(r'^P?(\d+)SM$')
+_METAR_RVR_RE = re.compile(r'^R(\d{2}[LCR]?)/([PM]?\d{4})')
+_METAR_CLOUD_RE = re.compile(r'^(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?$')
+_METAR_TEMP_RE = re.compile(r'^(M?\d{2})/(M?\d{2})$')
+_METAR_QNH_RE = re.compile(r'^[QA](\d{4})$')
+
+# TAF change-group markers and per-period patterns
+_TAF_PERIOD_MARKER_RE = re.compile(r'BECMG \d{4}/\d{4}|TEMPO \d{4}/\d{4}|FM\d{6}')
+_TAF_CHANGE_TIME_RE = re.compile(r'(?:BECMG|TEMPO)\s+\d{2}(\d{2})/\d{2}(\d{2})')
+_TAF_FM_TIME_RE = re.compile(r'FM\d{2}(\d{2})(\d{2})')
+_TAF_BASE_TIME_RE = re.compile(r'^\s*\w{4}\s+\d{6}Z\s+\d{2}(\d{2})/\d{2}(\d{2})')
+_TAF_WIND_RE = re.compile(r'(\d{3}|VRB)(\d{2,3})(G(\d{2,3}))?KT')
+_TAF_VIS_RE = re.compile(r'(?:^|\s)(\d{4})(?:\s|$)')
+_TAF_CLOUD_RE = re.compile(r'(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?')
+
+# TAF period weather codes we report, in display order
+_TAF_WX_CODES = ('BR', 'FG', 'HZ', 'RA', 'SN', 'TS', 'DZ', 'SH', 'GR', 'GS')
+# Same vocabulary in the alphabetical order the sortie-window summary reports
+_TAF_WX_SORTED = tuple(sorted(_TAF_WX_CODES))
+
+
+# METAR present-weather 2-letter codes
+_WX_CODES = frozenset({
+    'MI', 'BC', 'PR', 'DR', 'BL', 'SH', 'TS', 'FZ',  # Descriptors
+    'DZ', 'RA', 'SN', 'SG', 'IC', 'PL', 'GR', 'GS',  # Precipitation
+    'BR', 'FG', 'FU', 'VA', 'DU', 'SA', 'HZ', 'PO',  # Obscuration
+    'SQ', 'FC', 'SS', 'DS',                             # Other
+})
+
+
+@lru_cache(maxsize=512)
+def _is_wx_token(token: str) -> bool:
+    """METARParser._is_weather_token(), cached — the same groups recur across reports."""
+    t = token.upper().lstrip('+-')
+    n = len(t)
+    if n == 2:
+        return t in _WX_CODES
+    if n < 2 or n > 8 or n % 2 != 0:
+        return False
+    return all(t[i:i+2] in _WX_CODES for i in range(0, n, 2))
+
+
+# Whole present-weather group ("+TSRA", "VCSH", "-SHRA"); group(1) is the
+# run of 2-letter codes. Anchored on whitespace so ICAOs like OEGS don't hit.
+_TAF_WX_GROUP_RE = re.compile(
+    r'(?<!\S)[+-]?(?:VC|RE)?((?:' + '|'.join(sorted(_WX_CODES)) + r')+)(?!\S)'
+)
 
 
 class METARParser:
     """Parse METAR strings and extract weather elements."""
     
+    __slots__ = (
+        'raw', 'icao', 'wind_dir', 'wind_speed', 'wind_gust',
+        'wind_variable_from', 'wind_variable_to', 'visibility_m', 'clouds',
+        'weather', 'temp', 'dewpoint', 'qnh', 'cavok', 'nsc', 'rvr', 'remarks',
+        'has_ts_weather', 'parse_warnings', 'obs_day', 'obs_hour', 'obs_minute',
+        '_cb_details', '_has_cb_cloud', '_ceiling_ft',
+    )
+    
     def __init__(self, metar_string: str):
         self.raw = metar_string.strip()
         self.icao = None
@@ -57,8 +278,10 @@ class METARParser:
         self.nsc = False
         self.rvr = []
         self.remarks = ""
-        self.cb_details = []  # List of CB observations with distance/direction
+        self._cb_details = None  # CB observations with distance/direction (lazy)
         self.has_ts_weather = False  # TS in weather group
+        self._has_cb_cloud = False  # Any CB cloud layer (set as layers are added)
+        self._ceiling_ft = None  # Lowest BKN/OVC height (kept as layers are added)
         self.parse_warnings = []  # Track what couldn't be parsed
         self.parse()
     
@@ -69,7 +292,8 @@ class METARParser:
             issues.append("❌ Wind group not found — expected format like 33012KT or VRB03KT")
         if self.visibility_m is None and not self.cavok:
             issues.append("❌ Visibility not found — expected 4-digit meters (e.g. 9999, 3000) or CAVOK")
-        has_sky_code = any(code in self.raw.upper() for code in ['NSC', 'SKC', 'NCD', 'CLR'])
+        # self.raw is upper-cased once in parse()
+        has_sky_code = any(code in self.raw for code in ['NSC', 'SKC', 'NCD', 'CLR'])
         if not self.clouds and not self.cavok and not has_sky_code:
             issues.append("⚠️ No cloud groups found — expected format like FEW040, SCT080, BKN015, OVC003")
         if self.temp is None:
@@ -85,16 +309,7 @@ class METARParser:
         Weather tokens are composed of 2-character codes (with optional +/- prefix).
         e.g. TSRA = TS+RA, BLDU = BL+DU, +SHRA = SH+RA, -DZ = DZ
         """
-        t = token.upper().lstrip('+-')
-        if len(t) < 2 or len(t) > 8 or len(t) % 2 != 0:
-            return False
-        wx_codes = {
-            'MI', 'BC', 'PR', 'DR', 'BL', 'SH', 'TS', 'FZ',  # Descriptors
-            'DZ', 'RA', 'SN', 'SG', 'IC', 'PL', 'GR', 'GS',  # Precipitation
-            'BR', 'FG', 'FU', 'VA', 'DU', 'SA', 'HZ', 'PO',  # Obscuration
-            'SQ', 'FC', 'SS', 'DS',                             # Other
-        }
-        return all(t[i:i+2] in wx_codes for i in range(0, len(t), 2))
+        return _is_wx_token(token)
     
     def parse(self):
         """Parse METAR string using order-independent token classification.
@@ -105,177 +320,150 @@ class METARParser:
         """
         # Normalise to uppercase — METARs are case-insensitive
         self.raw = self.raw.upper()
-        parts = self.raw.split()
-        
-        # Remove METAR/SPECI prefix
-        if parts and parts[0] in ('METAR', 'SPECI'):
-            parts = parts[1:]
+        raw = self.raw
         
         # --- Split observation from trend/remarks ---
         # Everything after NOSIG/TEMPO/BECMG is trend forecast (not observation)
         # Everything after RMK is remarks
-        obs_parts = []
-        trend_start = None
-        rmk_start = None
-        
-        for i, part in enumerate(parts):
-            if part == 'RMK' and rmk_start is None:
-                rmk_start = i
-                break
-            if part in ('NOSIG', 'TEMPO', 'BECMG') and trend_start is None:
-                trend_start = i
-                break
-            obs_parts.append(part)
-        
-        # Capture remarks
-        if rmk_start is not None:
-            self.remarks = ' '.join(parts[rmk_start + 1:])
-        elif trend_start is not None:
-            # Check for RMK after trend
-            for i in range(trend_start, len(parts)):
-                if parts[i] == 'RMK':
-                    self.remarks = ' '.join(parts[i + 1:])
-                    break
+        # Locate the first section keyword once and split only the observation
+        section = _METAR_SECTION_RE.search(raw)
+        if section is None:
+            obs_parts = raw.split()
+        else:
+            obs_parts = raw[:section.start()].split()
+            if section.group() == 'RMK':
+                rmk = section
+            else:
+                # Check for RMK after trend
+                rmk = _METAR_RMK_RE.search(raw, section.end())
+            if rmk is not None:
+                self.remarks = ' '.join(raw[rmk.end():].split())
         
-        # Track which tokens have been consumed
-        consumed = set()
+        # Remove METAR/SPECI prefix
+        if obs_parts and obs_parts[0] in ('METAR', 'SPECI'):
+            obs_parts = obs_parts[1:]
         
         # --- 1. ICAO code (4 uppercase letters, not a weather token) ---
         # Only look in first 3 tokens to avoid false matches
+        icao_idx = None
         for i, part in enumerate(obs_parts[:3]):
             if (len(part) == 4 and part.isalpha() and part.isupper()
                     and not self._is_weather_token(part)
                     and part not in ('AUTO', 'CAVOK')):
                 self.icao = part
-                consumed.add(i)
+                icao_idx = i
                 break
         
         if not self.icao:
             self.icao = 'OEKF'
         
-        # --- 2. Timestamp (DDHHmmZ) ---
         self.obs_day = None
         self.obs_hour = None
         self.obs_minute = None
+        
+        # --- 2-11. Single pass over the remaining tokens ---
+        # Each group shape matches at most one handler, so a token is claimed
+        # by the first handler that accepts it. Single-occurrence groups
+        # (time, wind, variable wind, visibility, temp, QNH) take the first
+        # token seen; later duplicates are ignored.
+        wind_done = var_done = vis_done = temp_done = qnh_done = False
         for i, part in enumerate(obs_parts):
-            if i in consumed:
+            if i == icao_idx:
                 continue
-            if re.match(r'^\d{6}Z$', part):
+            last = part[-1]
+            
+            # Fixed-width numeric groups are checked with str methods rather
+            # than the regex engine (isdecimal() is exactly what \d accepts)
+            
+            # Timestamp (DDHHmmZ)
+            if (last == 'Z' and self.obs_hour is None and len(part) == 7
+                    and part[:6].isdecimal()):
                 self.obs_day = int(part[:2])
                 self.obs_hour = int(part[2:4])
                 self.obs_minute = int(part[4:6])
-                consumed.add(i)
-                break
-        
-        if self.obs_hour is None:
-            _now = datetime.now(timezone.utc)
-            self.obs_day = _now.day
-            self.obs_hour = _now.hour
-            self.obs_minute = _now.minute
-        
-        # --- 3. AUTO / COR ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
                 continue
+            
+            # AUTO / COR
             if part in ('AUTO', 'COR'):
-                consumed.add(i)
-        
-        # --- 4. Wind (dddssKT, dddssGggKT, VRBssKT, 00000KT) ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
-                continue
-            match = re.match(r'^(\d{3}|VRB)(\d{2,3})(G(\d{2,3}))?KT$', part)
-            if match:
-                if match.group(1) == 'VRB':
-                    self.wind_dir = None
-                elif match.group(1) == '000':
-                    self.wind_dir = 0
-                    self.wind_speed = 0
-                else:
-                    self.wind_dir = int(match.group(1))
-                
-                if match.group(1) != '000':
-                    self.wind_speed = int(match.group(2))
-                    if match.group(4):
-                        self.wind_gust = int(match.group(4))
-                consumed.add(i)
-                break
-        
-        # --- 5. Variable wind direction (dddVddd) ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
                 continue
-            match = re.match(r'^(\d{3})V(\d{3})$', part)
-            if match:
-                self.wind_variable_from = int(match.group(1))
-                self.wind_variable_to = int(match.group(2))
-                consumed.add(i)
-                break
-        
-        # --- 6. Visibility (4-digit meters, CAVOK, statute miles) ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
-                continue
-            if part == 'CAVOK':
-                self.cavok = True
-                self.visibility_m = 10000
-                consumed.add(i)
-                break
-            elif re.match(r'^P?\d+SM$', part):
-                sm_match = re.match(r'^P?(\d+)SM$', part)
-                sm = int(sm_match.group(1))
-                self.visibility_m = int(sm * 1609)
-                consumed.add(i)
-                break
-            elif re.match(r'^\d{4}$', part):
-                vis = int(part)
-                self.visibility_m = 10000 if vis == 9999 else vis
-                consumed.add(i)
-                break
-        
-        # --- 7. RVR (R33L/1200M, R15L/P2000) ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
+            
+            # Wind (dddssKT, dddssGggKT, VRBssKT, 00000KT)
+            if last == 'T' and not wind_done:
+                match = _METAR_WIND_RE.match(part)
+                if match:
+                    if match.group(1) == 'VRB':
+                        self.wind_dir = None
+                    elif match.group(1) == '000':
+                        self.wind_dir = 0
+                        self.wind_speed = 0
+                    else:
+                        self.wind_dir = int(match.group(1))
+                    
+                    if match.group(1) != '000':
+                        self.wind_speed = int(match.group(2))
+                        if match.group(4):
+                            self.wind_gust = int(match.group(4))
+                    wind_done = True
+                    continue
+            
+            # Variable wind direction (dddVddd)
+            if (not var_done and len(part) == 7 and part[3] == 'V'
+                    and part[:3].isdecimal() and part[4:].isdecimal()):
+                self.wind_variable_from = int(part[:3])
+                self.wind_variable_to = int(part[4:])
+                var_done = True
                 continue
-            if part.startswith('R'):
-                match = re.match(r'^R(\d{2}[LCR]?)/([PM]?\d{4})', part)
+            
+            # Visibility (4-digit meters, CAVOK, statute miles)
+            if not vis_done:
+                if part == 'CAVOK':
+                    self.cavok = True
+                    self.visibility_m = 10000
+                    vis_done = True
+                    continue
+                if last == 'M':
+                    sm_match = _METAR_VIS_SM_RE.match(part)
+                    if sm_match:
+                        sm = int(sm_match.group(1))
+                        self.visibility_m = int(sm * 1609)
+                        vis_done = True
+                        continue
+                elif len(part) == 4 and part.isdecimal():
+                    vis = int(part)
+                    self.visibility_m = 10000 if vis == 9999 else vis
+                    vis_done = True
+                    continue
+            
+            # RVR (R33L/1200M, R15L/P2000)
+            if part[0] == 'R':
+                match = _METAR_RVR_RE.match(part)
                 if match:
                     self.rvr.append({
                         'runway': match.group(1),
                         'distance_m': match.group(2)
                     })
-                    consumed.add(i)
-        
-        # --- 8. Weather phenomena (BR, FG, TSRA, BLDU, +SHRA, etc.) ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
-                continue
-            upper = part.upper()
-            # Standalone CB or TCU
-            if upper in ('CB', 'TCU'):
-                if upper == 'CB':
+                    continue
+            
+            # Weather phenomena (BR, FG, TSRA, BLDU, +SHRA, etc.)
+            # Standalone CB or TCU (tokens are already upper-case)
+            if part in ('CB', 'TCU'):
+                if part == 'CB':
                     self.weather.append('CB')
-                consumed.add(i)
                 continue
             if self._is_weather_token(part):
                 self.weather.append(part)
-                if 'TS' in upper:
+                if 'TS' in part:
                     self.has_ts_weather = True
-                consumed.add(i)
-        
-        # --- 9. Clouds (FEW040, SCT020, BKN015CB, OVC010, NSC, SKC, NCD, CLR) ---
-        clear_sky_codes = {'NSC', 'SKC', 'NCD', 'CLR'}
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
                 continue
-            if part in clear_sky_codes:
+            
+            # Clouds (FEW040, SCT020, BKN015CB, OVC010, NSC, SKC, NCD, CLR)
+            if part in _CLEAR_SKY_CODES:
                 if part == 'NSC':
                     self.nsc = True
-                consumed.add(i)
                 continue
-            match = re.match(r'^(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?$', part)
+            match = _METAR_CLOUD_RE.match(part) if part[:3] in COVERAGE_RANK else None
             if match:
-                coverage = match.group(1)
+                coverage = sys.intern(match.group(1))
                 height_ft = int(match.group(2)) * 100
                 cloud_type = match.group(3) if match.group(3) else None
                 self.clouds.append({
@@ -283,63 +471,73 @@ class METARParser:
                     'height_ft': height_ft,
                     'type': cloud_type
                 })
-                consumed.add(i)
-        
-        # --- 10. Temperature / Dewpoint (22/10, M02/M05) ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
+                if cloud_type == 'CB':
+                    self._has_cb_cloud = True
+                if coverage in _BKN_OVC and \
+                   (self._ceiling_ft is None or height_ft < self._ceiling_ft):
+                    self._ceiling_ft = height_ft
                 continue
-            match = re.match(r'^(M?\d{2})/(M?\d{2})$', part)
-            if match:
-                self.temp = int(match.group(1).replace('M', '-'))
-                self.dewpoint = int(match.group(2).replace('M', '-'))
-                consumed.add(i)
-                break
+            
+            # Temperature / Dewpoint (22/10, M02/M05)
+            if not temp_done and '/' in part:
+                match = _METAR_TEMP_RE.match(part)
+                if match:
+                    self.temp = int(match.group(1).replace('M', '-'))
+                    self.dewpoint = int(match.group(2).replace('M', '-'))
+                    temp_done = True
+                    continue
+            
+            # QNH (Q1013 or A2992)
+            if not qnh_done and part[0] in 'QA':
+                match = _METAR_QNH_RE.match(part)
+                if match:
+                    self.qnh = int(match.group(1))
+                    qnh_done = True
         
-        # --- 11. QNH (Q1013 or A2992) ---
-        for i, part in enumerate(obs_parts):
-            if i in consumed:
-                continue
-            match = re.match(r'^Q(\d{4})$', part)
-            if match:
-                self.qnh = int(match.group(1))
-                consumed.add(i)
-                break
-            match = re.match(r'^A(\d{4})$', part)
-            if match:
-                self.qnh = int(match.group(1))
-                consumed.add(i)
-                break
+        # Keep layers lowest-first whatever the report order: ceiling and
+        # lowest-cloud lookups rely on it
+        self.clouds.sort(key=_HEIGHT_KEY)
+        
+        if self.obs_hour is None:
+            _now = datetime.now(timezone.utc)
+            self.obs_day = _now.day
+            self.obs_hour = _now.hour
+            self.obs_minute = _now.minute
+        
+        # CB details from remarks are parsed on first access (cb_details)
+        self._cb_details = None
+    
+    @property
+    def cb_details(self) -> List[dict]:
+        """CB observations with distance/direction, parsed on first access.
         
-        # Parse CB details from remarks and full METAR
-        self._parse_cb_details()
+        has_cb() and has_cb_within_nm() only reach this when there is no CB
+        cloud layer or TS weather, so most reports never run the remark regex.
+        """
+        if self._cb_details is None:
+            self._cb_details = self._parse_cb_details()
+        return self._cb_details
     
-    def _parse_cb_details(self):
+    def _parse_cb_details(self) -> List[dict]:
         """Parse CB distance/direction from METAR remarks and weather groups."""
-        full_text = self.raw.upper()
-        
-        # Pattern: CB followed by direction/distance
-        # Examples: "CB NW MOV E", "CB DSNT W", "CB OHD MOV NE", "CB NW-N 25NM"
-        # Longer patterns first to avoid partial matches (NW before N, etc.)
-        directions = r'(?:NE|NW|SE|SW|N|E|W|S|OHD|DSNT|VC)'
-        
-        # CB with direction: "CB NW MOV E", "CB DSNT SW"
-        cb_pattern = re.compile(
-            r'\bCB\s+(' + directions + r'(?:[-/]' + directions + r')?)'
-            r'(?:\s+(\d+)\s*NM)?'
-            r'(?:\s+MOV\s+(' + directions + r'))?',
-            re.IGNORECASE
-        )
+        full_text = self.raw  # Already upper-cased in parse()
+        details = []
+        
+        # Cheap pre-filter — most METARs carry no CB at all; otherwise start
+        # the regex scan at the first occurrence (\b still sees the prior char)
+        start = full_text.find('CB')
+        if start == -1:
+            return details
         
-        for match in cb_pattern.finditer(full_text):
+        for match in _CB_DETAIL_RE.finditer(full_text, start):
+            loc, dist, mov = match.group('loc', 'dist', 'mov')
             detail = {
-                'location': match.group(1),
-                'distance_nm': int(match.group(2)) if match.group(2) else None,
-                'movement': match.group(3)
+                'location': loc,
+                'distance_nm': int(dist) if dist else None,
+                'movement': mov
             }
             # DSNT = distant (typically 10-30 NM); VC = vicinity (5-10 NM)
             if detail['distance_nm'] is None:
-                loc = detail['location'].upper()
                 if 'DSNT' in loc:
                     detail['distance_nm'] = 25  # Estimate
                 elif 'VC' in loc:
@@ -347,10 +545,11 @@ class METARParser:
                 elif 'OHD' in loc:
                     detail['distance_nm'] = 0   # Overhead
             
-            self.cb_details.append(detail)
+            details.append(detail)
         
         # Also check for "TS" in weather groups (already sets has_ts_weather in parse())
         # And check for TCU in cloud layers (towering cumulus - precursor to CB)
+        return details
     
     def get_effective_wind_speed(self) -> int:
         """Return effective wind speed (gusts count as wind speed)."""
@@ -360,38 +559,23 @@ class METARParser:
     
     def get_ceiling_ft(self) -> Optional[int]:
         """Return ceiling (lowest BKN or OVC layer)."""
-        for cloud in self.clouds:
-            if cloud['coverage'] in ['BKN', 'OVC']:
-                return cloud['height_ft']
-        return None
+        return self._ceiling_ft
     
     def get_lowest_cloud_ft(self) -> Optional[int]:
         """Return lowest cloud layer of any type."""
         if self.clouds:
-            return min(c['height_ft'] for c in self.clouds)
+            return self.clouds[0]['height_ft']  # Kept sorted by height
         return None
     
     def has_cb(self) -> bool:
         """Check if CB (cumulonimbus) is present in cloud layers, weather, or remarks."""
-        for cloud in self.clouds:
-            if cloud.get('type') == 'CB':
-                return True
-        # TS (thunderstorm) in weather implies CB activity
-        if self.has_ts_weather:
-            return True
-        # CB mentioned in remarks
-        if self.cb_details:
-            return True
-        return False
+        # TS (thunderstorm) in weather implies CB activity; CB in remarks counts too
+        return self._has_cb_cloud or self.has_ts_weather or bool(self.cb_details)
     
     def has_cb_within_nm(self, max_nm: int = 30) -> bool:
         """Check if CB is reported within a given distance (NM)."""
-        # CB in cloud layers = overhead
-        for cloud in self.clouds:
-            if cloud.get('type') == 'CB':
-                return True
-        # TS in weather = at the station
-        if self.has_ts_weather:
+        # CB in cloud layers = overhead; TS in weather = at the station
+        if self._has_cb_cloud or self.has_ts_weather:
             return True
         # Check CB details from remarks
         for cb in self.cb_details:
@@ -410,7 +594,7 @@ class METARParser:
             if cloud.get('type') == 'CB':
                 warnings.append(f"CB in cloud layer at {cloud['height_ft']}ft")
         if self.has_ts_weather:
-            ts_wx = [w for w in self.weather if 'TS' in w.upper()]
+            ts_wx = [w for w in self.weather if 'TS' in w]
             warnings.append(f"Thunderstorm activity: {' '.join(ts_wx)}")
         for cb in self.cb_details:
             parts = [f"CB {cb['location']}"]
@@ -449,18 +633,25 @@ class METARParser:
         # Clouds/ceiling: merge — add any TAF clouds that are lower
         for taf_cloud in taf_overrides.get('clouds', []):
             # Check if this cloud is lower than any existing METAR cloud
+            # (ranked, not string-compared: 'SCT' > 'BKN' alphabetically)
+            taf_coverage, taf_height = _COVERAGE_HEIGHT(taf_cloud)
+            taf_rank = COVERAGE_RANK[taf_coverage]
             already_covered = False
-            for mc in self.clouds:
-                if mc['height_ft'] <= taf_cloud['height_ft'] and \
-                   mc['coverage'] >= taf_cloud['coverage']:  # BKN > SCT etc (string compare works)
+            for mc_coverage, mc_height in map(_COVERAGE_HEIGHT, self.clouds):
+                if mc_height <= taf_height and COVERAGE_RANK[mc_coverage] >= taf_rank:
                     already_covered = True
                     break
             if not already_covered:
                 self.clouds.append(taf_cloud)
-                factors.append(f"Cloud → {taf_cloud['coverage']}{taf_cloud['height_ft']//100:03d} (TAF)")
+                if taf_cloud.get('type') == 'CB':
+                    self._has_cb_cloud = True
+                if taf_coverage in _BKN_OVC and \
+                   (self._ceiling_ft is None or taf_height < self._ceiling_ft):
+                    self._ceiling_ft = taf_height
+                factors.append(f"Cloud → {taf_coverage}{taf_height//100:03d} (TAF)")
         
         # Re-sort clouds by height
-        self.clouds.sort(key=lambda c: c['height_ft'])
+        self.clouds.sort(key=_HEIGHT_KEY)
         
         # CB
         if taf_overrides.get('has_cb') and not self.has_cb():
@@ -468,9 +659,11 @@ class METARParser:
             self.has_ts_weather = True
             factors.append('CB forecast (TAF)')
         
-        # Weather phenomena
+        # Weather phenomena (set-backed membership, list keeps report order)
+        seen_wx = set(self.weather)
         for wx in taf_overrides.get('weather', []):
-            if wx not in self.weather:
+            if wx not in seen_wx:
+                seen_wx.add(wx)
                 self.weather.append(wx)
                 if wx == 'TS':
                     self.has_ts_weather = True
@@ -481,6 +674,11 @@ class METARParser:
 class TAFParser:
     """Parse TAF strings and extract forecast periods."""
     
+    __slots__ = (
+        'raw', 'icao', 'base_period', 'becmg_periods', 'tempo_periods',
+        'fm_periods', '_periods', '_deterioration', '_columns',
+    )
+    
     def __init__(self, taf_string: str):
         self.raw = taf_string.strip()
         self.icao = None
@@ -488,6 +686,9 @@ class TAFParser:
         self.becmg_periods = []
         self.tempo_periods = []
         self.fm_periods = []  # FM (From) groups
+        self._periods = None  # Memoized get_all_periods()
+        self._deterioration = {}  # Memoized check_deterioration() by limits
+        self._columns = None  # Memoized period_columns()
         self.parse()
     
     def parse(self):
@@ -507,58 +708,16 @@ class TAFParser:
                     self.icao = part
                     break
         
-        # Split into base, BECMG, TEMPO, and FM groups
-        # Base is everything before first BECMG/TEMPO/FM
-        becmg_pattern = r'BECMG \d{4}/\d{4}'
-        tempo_pattern = r'TEMPO \d{4}/\d{4}'
-        fm_pattern = r'FM\d{6}'
-        
-        # Combined pattern to find next period marker (for boundary detection)
-        next_period_re = re.compile(r'(BECMG \d{4}/\d{4}|TEMPO \d{4}/\d{4}|FM\d{6})')
-        
-        # Find all BECMG periods
-        for match in re.finditer(becmg_pattern, text):
-            start = match.start()
-            end = len(text)
-            
-            # Look for next period marker after this one
-            next_match = next_period_re.search(text, start + len(match.group()))
-            if next_match:
-                end = next_match.start()
-            
-            period_text = text[start:end].strip()
-            self.becmg_periods.append(self._parse_period(period_text))
-        
-        # Find all TEMPO periods
-        for match in re.finditer(tempo_pattern, text):
-            start = match.start()
-            end = len(text)
-            
-            next_match = next_period_re.search(text, start + len(match.group()))
-            if next_match:
-                end = next_match.start()
-            
-            period_text = text[start:end].strip()
-            self.tempo_periods.append(self._parse_period(period_text))
-        
-        # Find all FM periods
-        for match in re.finditer(fm_pattern, text):
-            start = match.start()
-            end = len(text)
-            
-            next_match = next_period_re.search(text, start + len(match.group()))
-            if next_match:
-                end = next_match.start()
-            
-            period_text = text[start:end].strip()
-            self.fm_periods.append(self._parse_period(period_text))
-        
-        # Base period is everything before first BECMG/TEMPO/FM
-        base_end = len(text)
-        first_marker = next_period_re.search(text)
-        if first_marker:
-            base_end = first_marker.start()
+        # Split into base, BECMG, TEMPO, and FM groups in one scan: each
+        # group runs to the next marker, base is everything before the first
+        markers = list(_TAF_PERIOD_MARKER_RE.finditer(text))
+        groups = {'B': self.becmg_periods, 'T': self.tempo_periods, 'F': self.fm_periods}
+        for k, match in enumerate(markers):
+            end = markers[k + 1].start() if k + 1 < len(markers) else len(text)
+            period_text = text[match.start():end].strip()
+            groups[match.group()[0]].append(self._parse_period(period_text))
         
+        base_end = markers[0].start() if markers else len(text)
         base_text = text[:base_end].strip()
         self.base_period = self._parse_period(base_text)
     
@@ -573,54 +732,63 @@ class TAFParser:
             'wind_gust': None,
             'visibility_m': None,
             'clouds': [],
+            'ceiling_ft': None,      # First BKN/OVC layer (groups are reported lowest first)
             'weather': [],
             'has_cb': False
         }
         
         # Extract validity period times
         # BECMG/TEMPO: "BECMG 3106/3108" or "TEMPO 3112/3118"
-        time_match = re.search(r'(?:BECMG|TEMPO)\s+\d{2}(\d{2})/\d{2}(\d{2})', period_text)
+        time_match = _TAF_CHANGE_TIME_RE.search(period_text)
         if time_match:
             result['valid_from_utc'] = int(time_match.group(1))
             result['valid_to_utc'] = int(time_match.group(2))
         
         # FM group: "FM310800" → from 08Z
-        fm_match = re.match(r'FM\d{2}(\d{2})(\d{2})', period_text)
+        fm_match = _TAF_FM_TIME_RE.match(period_text)
         if fm_match:
             result['valid_from_utc'] = int(fm_match.group(1))
             # FM periods run until next FM or end of TAF (set to 24 as sentinel)
             result['valid_to_utc'] = 24
         
         # Base TAF validity: "3100/3124" or "0100/0206"
-        base_match = re.search(r'^\s*\w{4}\s+\d{6}Z\s+\d{2}(\d{2})/\d{2}(\d{2})', period_text)
+        base_match = _TAF_BASE_TIME_RE.search(period_text)
         if base_match:
             result['valid_from_utc'] = int(base_match.group(1))
             result['valid_to_utc'] = int(base_match.group(2))
         
+        # Cheap gates: wind needs "KT"; wind/vis/cloud groups all need a digit
+        # after the group header. Short groups like "BECMG 3106/3108 NSW" or
+        # "TEMPO 3112/3114 TSRA" skip those regexes entirely.
+        header_end = 0
+        for m in (time_match, fm_match, base_match):
+            if m:
+                header_end = max(header_end, m.end())
+        has_digits = any(c.isdigit() for c in period_text[header_end:])
+        
         # Wind
-        wind_pattern = r'(\d{3}|VRB)(\d{2,3})(G(\d{2,3}))?KT'
-        match = re.search(wind_pattern, period_text)
-        if match:
-            if match.group(1) != 'VRB':
-                result['wind_dir'] = int(match.group(1))
-            result['wind_speed'] = int(match.group(2))
-            if match.group(4):
-                result['wind_gust'] = int(match.group(4))
+        if has_digits and 'KT' in period_text:
+            match = _TAF_WIND_RE.search(period_text)
+            if match:
+                if match.group(1) != 'VRB':
+                    result['wind_dir'] = int(match.group(1))
+                result['wind_speed'] = int(match.group(2))
+                if match.group(4):
+                    result['wind_gust'] = int(match.group(4))
         
         # Visibility
-        vis_pattern = r'(?:^|\s)(\d{4})(?:\s|$)'
-        match = re.search(vis_pattern, period_text)
-        if match:
-            vis = int(match.group(1))
-            result['visibility_m'] = 10000 if vis == 9999 else vis
+        if has_digits:
+            match = _TAF_VIS_RE.search(period_text)
+            if match:
+                vis = int(match.group(1))
+                result['visibility_m'] = 10000 if vis == 9999 else vis
         
         if 'CAVOK' in period_text:
             result['visibility_m'] = 10000
         
         # Clouds
-        cloud_pattern = r'(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?'
-        for match in re.finditer(cloud_pattern, period_text):
-            coverage = match.group(1)
+        for match in (_TAF_CLOUD_RE.finditer(period_text) if has_digits else ()):
+            coverage = sys.intern(match.group(1))
             height_ft = int(match.group(2)) * 100
             cloud_type = match.group(3)
             
@@ -629,6 +797,8 @@ class TAFParser:
                 'height_ft': height_ft,
                 'type': cloud_type
             })
+            if result['ceiling_ft'] is None and coverage in _BKN_OVC:
+                result['ceiling_ft'] = height_ft
             
             if cloud_type == 'CB':
                 result['has_cb'] = True
@@ -637,16 +807,48 @@ class TAFParser:
         if 'CB' in period_text:
             result['has_cb'] = True
         
-        # Weather phenomena
-        weather_codes = ['BR', 'FG', 'HZ', 'RA', 'SN', 'TS', 'DZ', 'SH', 'GR', 'GS']
-        for code in weather_codes:
-            if code in period_text:
-                result['weather'].append(code)
+        # Weather phenomena: decompose whole weather groups (TSRA → TS, RA)
+        found = set()
+        for group in _TAF_WX_GROUP_RE.findall(period_text):
+            found.update(group[i:i+2] for i in range(0, len(group), 2))
+        result['weather'] = [code for code in _TAF_WX_CODES if code in found]
         
         return result
     
+    def to_dict(self) -> dict:
+        """Serialise the parsed TAF (used by the parsed-TAF cache sidecar)."""
+        return {
+            'schema': TAF_PARSED_SCHEMA_VERSION,
+            'raw': self.raw,
+            'icao': self.icao,
+            'base_period': self.base_period,
+            'becmg_periods': self.becmg_periods,
+            'tempo_periods': self.tempo_periods,
+            'fm_periods': self.fm_periods,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TAFParser':
+        """Rebuild a parser from to_dict() output without re-running the regexes."""
+        taf = cls.__new__(cls)
+        taf.raw = data['raw']
+        taf.icao = data.get('icao')
+        taf.base_period = data.get('base_period')
+        taf.becmg_periods = data.get('becmg_periods', [])
+        taf.tempo_periods = data.get('tempo_periods', [])
+        taf.fm_periods = data.get('fm_periods', [])
+        taf._periods = None
+        taf._deterioration = {}
+        taf._columns = None
+        return taf
+    
     def get_all_periods(self) -> List[dict]:
-        """Get all periods (base + BECMG + TEMPO + FM)."""
+        """Get all periods (base + BECMG + TEMPO + FM).
+        
+        Built once per parser and shared between callers — treat as read-only.
+        """
+        if self._periods is not None:
+            return self._periods
         periods = []
         if self.base_period:
             periods.append(('BASE', self.base_period))
@@ -656,8 +858,40 @@ class TAFParser:
             periods.append(('TEMPO', p))
         for p in self.fm_periods:
             periods.append(('FM', p))
+        self._periods = periods
         return periods
 
+    def period_columns(self) -> Tuple[tuple, ...]:
+        """Numeric per-period columns for get_planning_window() (memoized).
+        
+        One (is_base, valid_from, valid_to, visibility_m, wind_eff, ceiling_ft)
+        tuple per period. valid_to is already wrap-corrected (+24 when the
+        period crosses midnight) so the overlap test is two comparisons.
+        """
+        if self._columns is not None:
+            return self._columns
+        columns = []
+        for period_type, period in self.get_all_periods():
+            p_from = period.get('valid_from_utc')
+            p_to = period.get('valid_to_utc')
+            if p_from is not None:
+                p_from = float(p_from)
+                p_to = float(p_to) if p_to is not None else p_from + 24
+                if p_to <= p_from:
+                    p_to += 24
+            ceilings = [c['height_ft'] for c in period.get('clouds', [])
+                        if c['coverage'] in _BKN_OVC]
+            columns.append((
+                period_type == 'BASE',
+                p_from,
+                p_to,
+                period.get('visibility_m'),
+                period.get('wind_gust') or period.get('wind_speed') or 0,
+                min(ceilings) if ceilings else None,
+            ))
+        self._columns = tuple(columns)
+        return self._columns
+
     def get_planning_window(self, now_hour: int, now_min: int, window_min: int = 30) -> dict:
         """
         Get worst-case TAF conditions over [now, now+window_min].
@@ -681,30 +915,19 @@ class TAFParser:
             'factors': []  # Human-readable list of what TAF contributed
         }
         
-        def _period_overlaps(p_from, p_to):
-            """Check if TAF period [p_from, p_to) overlaps [window_start, window_end]."""
-            if p_from is None:
-                return True  # No time info → assume could overlap
-            pf = float(p_from)
-            pt = float(p_to) if p_to is not None else pf + 24
-            # Handle day wrap (e.g., valid_from=22, valid_to=6 means 22Z-06Z next day)
-            ws = window_start % 24
-            we = window_end % 24
-            if pt <= pf:
-                pt += 24
-            if we <= ws:
-                we += 24
-            return pf < we and pt > ws
-        
-        for period_type, period in self.get_all_periods():
-            if period_type == 'BASE':
-                # Base period always applies (it's the background forecast)
-                pass
-            else:
-                p_from = period.get('valid_from_utc')
-                p_to = period.get('valid_to_utc')
-                if not _period_overlaps(p_from, p_to):
-                    continue
+        # Handle day wrap once for the window; period bounds come pre-wrapped
+        # from period_columns() (e.g., valid_from=22, valid_to=6 → 22..30)
+        ws = window_start % 24
+        we = window_end % 24
+        if we <= ws:
+            we += 24
+        
+        for (period_type, period), (is_base, p_from, p_to, *_) in zip(
+                self.get_all_periods(), self.period_columns()):
+            # Base period always applies (it's the background forecast);
+            # a period with no time info is assumed to overlap
+            if not is_base and p_from is not None and not (p_from < we and p_to > ws):
+                continue
             
             # Visibility: take lowest
             p_vis = period.get('visibility_m')
@@ -730,14 +953,13 @@ class TAFParser:
             
             # Ceiling/clouds: take lowest ceiling
             for cloud in period.get('clouds', []):
-                if cloud['coverage'] in ['BKN', 'OVC']:
-                    h = cloud['height_ft']
+                coverage, h = _COVERAGE_HEIGHT(cloud)
+                if coverage in _BKN_OVC:
                     if overrides['ceiling_ft'] is None or h < overrides['ceiling_ft']:
                         overrides['ceiling_ft'] = h
                         if period_type != 'BASE':
                             overrides['factors'].append(f'{period_type}: ceiling {h}ft')
                 # Track lowest cloud of any type
-                h = cloud['height_ft']
                 if overrides['lowest_cloud_ft'] is None or h < overrides['lowest_cloud_ft']:
                     overrides['lowest_cloud_ft'] = h
                 overrides['clouds'].append(cloud)
@@ -755,15 +977,21 @@ class TAFParser:
         return overrides
     
     def check_deterioration(self, vis_limit_m: int = 5000, ceiling_limit_ft: int = 1500) -> Tuple[bool, str]:
-        """Check if any period shows deterioration below limits."""
+        """Check if any period shows deterioration below limits (memoized per limits)."""
+        key = (vis_limit_m, ceiling_limit_ft)
+        if key not in self._deterioration:
+            self._deterioration[key] = self._check_deterioration(vis_limit_m, ceiling_limit_ft)
+        return self._deterioration[key]
+    
+    def _check_deterioration(self, vis_limit_m: int, ceiling_limit_ft: int) -> Tuple[bool, str]:
         for period_type, period in self.get_all_periods():
             if period['visibility_m'] and period['visibility_m'] < vis_limit_m:
                 return True, f"{period_type}: Vis {period['visibility_m']}m < {vis_limit_m}m"
             
             # Check ceiling
-            for cloud in period['clouds']:
-                if cloud['coverage'] in ['BKN', 'OVC'] and cloud['height_ft'] < ceiling_limit_ft:
-                    return True, f"{period_type}: Ceiling {cloud['height_ft']}ft < {ceiling_limit_ft}ft"
+            for coverage, height_ft in map(_COVERAGE_HEIGHT, period['clouds']):
+                if coverage in _BKN_OVC and height_ft < ceiling_limit_ft:
+                    return True, f"{period_type}: Ceiling {height_ft}ft < {ceiling_limit_ft}ft"
         
         return False, ""
     
@@ -779,77 +1007,68 @@ class TAFParser:
         """
         window_start = (sortie_utc_hour - 1) % 24
         window_end = (sortie_utc_hour + 1) % 24
+        # Handle wrap-around midnight once for the window; +1 for inclusive end
+        if window_end <= window_start:
+            window_end += 24
+        window_end += 1
         
-        overlapping = []
-        
-        def _hours_overlap(p_from, p_to, w_from, w_end):
-            """Check if period [p_from, p_to) overlaps window [w_from, w_end]."""
-            if p_from is None or p_to is None:
-                return True  # If no time info, assume it could overlap
-            # Handle wrap-around midnight
-            if p_to <= p_from:
-                p_to += 24
-            if w_end <= w_from:
-                w_end += 24
-            return p_from < w_end + 1 and p_to > w_from  # +1 for inclusive end
-        
-        for period_type, period in self.get_all_periods():
-            p_from = period.get('valid_from_utc')
-            p_to = period.get('valid_to_utc')
-            
-            if _hours_overlap(p_from, p_to, window_start, window_end):
-                overlapping.append((period_type, period))
-        
-        if not overlapping:
-            return {'applicable': False, 'reason': 'No TAF periods cover sortie window'}
-        
-        # Find worst-case conditions across overlapping periods
+        # Worst-case conditions across overlapping periods
         worst_vis = None
         worst_ceiling = None
         worst_wind = 0
         worst_gust = 0
         has_cb = False
-        has_ts = False
         weather_set = set()
         deteriorating = False
+        overlapping = 0
         
         base_vis = None
         base_ceiling = None
         
-        for period_type, period in overlapping:
-            vis = period.get('visibility_m')
+        # Single pass: overlap test and reduction together — ceiling is
+        # precomputed per period at parse time
+        for period_type, period in self.get_all_periods():
+            p_from = period.get('valid_from_utc')
+            p_to = period.get('valid_to_utc')
+            # Period [p_from, p_to) vs window; no time info → assume it could overlap
+            if p_from is not None and p_to is not None:
+                if p_to <= p_from:
+                    p_to += 24
+                if not (p_from < window_end and p_to > window_start):
+                    continue
+            overlapping += 1
+            
+            is_base = period_type == 'BASE'
+            vis = period['visibility_m']
             if vis is not None:
                 if worst_vis is None or vis < worst_vis:
                     worst_vis = vis
-                if period_type == 'BASE':
+                if is_base:
                     base_vis = vis
             
-            # Ceiling from BKN/OVC layers
-            for cloud in period.get('clouds', []):
-                if cloud['coverage'] in ['BKN', 'OVC']:
-                    ceil = cloud['height_ft']
-                    if worst_ceiling is None or ceil < worst_ceiling:
-                        worst_ceiling = ceil
-                    if period_type == 'BASE':
-                        if base_ceiling is None or ceil < base_ceiling:
-                            base_ceiling = ceil
-                    break
+            ceil = period.get('ceiling_ft')
+            if ceil is not None:
+                if worst_ceiling is None or ceil < worst_ceiling:
+                    worst_ceiling = ceil
+                if is_base:
+                    base_ceiling = ceil
             
-            wind = period.get('wind_speed', 0) or 0
-            gust = period.get('wind_gust', 0) or 0
-            effective = gust if gust else wind
+            gust = period['wind_gust'] or 0
+            effective = gust or period['wind_speed'] or 0
             if effective > worst_wind:
                 worst_wind = effective
             if gust > worst_gust:
                 worst_gust = gust
             
-            if period.get('has_cb'):
+            if period['has_cb']:
                 has_cb = True
             
-            for wx in period.get('weather', []):
-                weather_set.add(wx)
-                if wx == 'TS':
-                    has_ts = True
+            weather_set.update(period['weather'])
+        
+        if not overlapping:
+            return {'applicable': False, 'reason': 'No TAF periods cover sortie window'}
+        
+        has_ts = 'TS' in weather_set
         
         # Check for deterioration within window
         if base_vis is not None and worst_vis is not None and worst_vis < base_vis:
@@ -872,8 +1091,10 @@ class TAFParser:
             parts.append("⚠️ CB")
         if has_ts:
             parts.append("⚠️ TS")
-        if weather_set - {'TS'}:
-            parts.append(f"Wx: {','.join(sorted(weather_set - {'TS'}))}")
+        weather = [code for code in _TAF_WX_SORTED if code in weather_set]
+        other_wx = [code for code in weather if code != 'TS']
+        if other_wx:
+            parts.append(f"Wx: {','.join(other_wx)}")
         
         summary = " | ".join(parts) if parts else "No significant weather"
         
@@ -885,13 +1106,24 @@ class TAFParser:
             'worst_gust_kt': worst_gust,
             'has_cb': has_cb,
             'has_ts': has_ts,
-            'weather': sorted(weather_set),
+            'weather': weather,
             'deteriorating': deteriorating,
-            'overlapping_periods': len(overlapping),
+            'overlapping_periods': overlapping,
             'summary': summary
         }
 
 
+def _angdiff(a: int, b: int) -> int:
+    """Unsigned angle between two directions, 0-180° (360° wrap, branch-free)."""
+    return 180 - abs((a - b) % 360 - 180)
+
+
+# (sin, cos) of every whole-degree wind/runway angle 0-180°: directions and
+# headings are integers, so the trig in the wind-component helpers is a lookup
+_WIND_TRIG = tuple((math.sin(math.radians(d)), math.cos(math.radians(d)))
+                   for d in range(181))
+
+
 def calculate_wind_components(wind_dir: int, wind_speed: int, runway_heading: int) -> Tuple[float, float]:
     """
     Calculate crosswind and headwind/tailwind components.
@@ -899,17 +1131,39 @@ def calculate_wind_components(wind_dir: int, wind_speed: int, runway_heading: in
     Returns:
         (crosswind, headwind) - headwind negative means tailwind
     """
-    angle_diff = abs(wind_dir - runway_heading)
-    if angle_diff > 180:
-        angle_diff = 360 - angle_diff
+    angle_diff = _angdiff(wind_dir, runway_heading)
     
-    angle_rad = math.radians(angle_diff)
-    crosswind = abs(wind_speed * math.sin(angle_rad))
-    headwind = wind_speed * math.cos(angle_rad)
+    if type(angle_diff) is int:
+        sin_a, cos_a = _WIND_TRIG[angle_diff]
+    else:
+        angle_rad = math.radians(angle_diff)
+        sin_a, cos_a = math.sin(angle_rad), math.cos(angle_rad)
+    crosswind = abs(wind_speed * sin_a)
+    headwind = wind_speed * cos_a
     
     return crosswind, headwind
 
 
+def _cloud_summary(clouds: List[dict]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """(lowest layer, lowest SCT/BKN/OVC, ceiling) heights in one pass over the layers.
+    
+    Any value is None when no layer qualifies. Layer order doesn't matter.
+    """
+    ceiling = None
+    lowest_cloud = None
+    lowest_sct_plus = None
+    for cov, h in map(_COVERAGE_HEIGHT, clouds):
+        if lowest_cloud is None or h < lowest_cloud:
+            lowest_cloud = h
+        rank = COVERAGE_RANK.get(cov, 0)  # FEW 1, SCT 2, BKN/OVC 3
+        if rank >= 2:
+            if lowest_sct_plus is None or h < lowest_sct_plus:
+                lowest_sct_plus = h
+            if rank == 3 and (ceiling is None or h < ceiling):
+                ceiling = h
+    return lowest_cloud, lowest_sct_plus, ceiling
+
+
 def determine_phase(resolved: dict, runway_heading: int, airfield_data: dict,
                     temp: int = None, cavok: bool = False, nsc: bool = False) -> dict:
     """
@@ -974,26 +1228,14 @@ def determine_phase(resolved: dict, runway_heading: int, airfield_data: dict,
     # Airport elevation — LOP phase thresholds are AMSL, cloud heights are AGL
     elevation_ft = airfield_data.get('OEKF', {}).get('elevation_ft', 0)
     
-    # Convert AMSL phase thresholds to AGL for comparison
-    unrestricted_cloud_agl = 8000 - elevation_ft  # e.g. 5930ft AGL at OEKF
-    restricted_cloud_agl = 6000 - elevation_ft     # e.g. 3930ft AGL
-    fs_vfr_cloud_agl = 5000 - elevation_ft         # e.g. 2930ft AGL
-    
     # CAVOK/NSC guarantee clear below 5000ft AGL only.
     # If no clouds reported and CAVOK/NSC, treat as "lowest observable cloud" at 5000ft AGL
     # — we don't know what's above that.
     clear_below_limit = cavok or nsc  # Both have same 5000ft AGL guarantee
     cavok_guarantee_agl = 5000  # CAVOK/NSC definition: no cloud below 5000ft AGL
     
-    # Cloud helpers (all heights AGL)
-    ceiling = None
-    lowest_cloud = None
-    for c in clouds:
-        h = c['height_ft']
-        if lowest_cloud is None or h < lowest_cloud:
-            lowest_cloud = h
-        if c['coverage'] in ('BKN', 'OVC') and (ceiling is None or h < ceiling):
-            ceiling = h
+    # Cloud helpers (all heights AGL) — single pass, reused by every tier
+    lowest_cloud, lowest_sct_plus, ceiling = _cloud_summary(clouds)
     
     # If CAVOK/NSC and no reported clouds, use guarantee as lowest observable
     if clear_below_limit and lowest_cloud is None:
@@ -1049,123 +1291,128 @@ def determine_phase(resolved: dict, runway_heading: int, airfield_data: dict,
         return result
     
     # --- Phase checks (most permissive → most restrictive) ---
+    approaches = airfield_data.get('OEKF', {}).get('approaches', [])
+    ifr_minima = _ifr_minimums(tuple(
+        (app['minimums'].get('visibility_m', 800), app['minimums'].get('ceiling_ft', 200))
+        for app in approaches
+    ))
+    phase, restrictions, checks = _evaluate_phase_tiers(
+        vis_m, lowest_cloud_for_phase, lowest_cloud, lowest_sct_plus, ceiling,
+        effective_wind, crosswind, tailwind, elevation_ft,
+        clear_below_limit and not clouds, ifr_minima,
+    )
+    result['phase'] = phase
+    result['restrictions'] = dict(restrictions)
+    result['checks'] = {name: list(phase_checks) for name, phase_checks in checks}
+    if phase == 'HOLD':
+        result['reasons'] = ['Weather below IFR minimums']
     
-    # UNRESTRICTED: No cloud below 8000ft AMSL (= unrestricted_cloud_agl AGL).
-    # Above that, only FEW allowed. CAVOK cannot satisfy if threshold > 5000ft AGL.
-    unrestricted_checks = []
-    unrestricted_checks.append(('Vis ≥ 8km', vis_km is not None and vis_km >= 8))
-    unrestricted_checks.append((f'No cloud < 8000ft AMSL ({unrestricted_cloud_agl}ft AGL)',
-                                 lowest_cloud_for_phase is None or lowest_cloud_for_phase >= unrestricted_cloud_agl))
-    
-    no_sct_bkn_ovc = True
-    for cloud in clouds:
-        if cloud['height_ft'] < unrestricted_cloud_agl:
-            no_sct_bkn_ovc = False
-            break
-        if cloud['coverage'] in ['SCT', 'BKN', 'OVC']:
-            no_sct_bkn_ovc = False
-            break
-    # CAVOK/NSC: cannot guarantee above 5000ft AGL
-    if clear_below_limit and not clouds and unrestricted_cloud_agl > cavok_guarantee_agl:
-        no_sct_bkn_ovc = False
-    
-    unrestricted_checks.append((f'Max FEW above 8000ft AMSL', no_sct_bkn_ovc))
-    unrestricted_checks.append(('Total wind ≤ 25kt', effective_wind <= 25))
-    unrestricted_checks.append(('Crosswind ≤ 15kt', crosswind <= 15))
-    unrestricted_checks.append(('Tailwind ≤ 5kt', tailwind <= 5))
-    result['checks']['UNRESTRICTED'] = unrestricted_checks
-    
-    if all(check[1] for check in unrestricted_checks):
-        result['phase'] = 'UNRESTRICTED'
-        result['restrictions'] = {'solo_cadets': True, 'first_solo': True}
-        return result
+    return result
+
+
+def _ifr_minimums(app_minimums: Tuple[Tuple[int, int], ...]) -> Tuple[int, int]:
+    """IFR phase minimums (vis m, ceiling ft): lowest approach vis, ceiling + 300ft.
     
-    # RESTRICTED: No cloud below 6000ft AMSL (= restricted_cloud_agl AGL). Max SCT above.
-    restricted_checks = []
-    restricted_checks.append(('Vis ≥ 8km', vis_km is not None and vis_km >= 8))
-    restricted_checks.append((f'No cloud < 6000ft AMSL ({restricted_cloud_agl}ft AGL)',
-                               lowest_cloud_for_phase is None or lowest_cloud_for_phase >= restricted_cloud_agl))
-    
-    no_bkn_ovc = True
-    for cloud in clouds:
-        if cloud['height_ft'] < restricted_cloud_agl:
-            no_bkn_ovc = False
-            break
-        if cloud['coverage'] in ['BKN', 'OVC']:
-            no_bkn_ovc = False
-            break
-    
-    restricted_checks.append((f'Max SCT above 6000ft AMSL', no_bkn_ovc))
-    restricted_checks.append(('Total wind ≤ 25kt', effective_wind <= 25))
-    restricted_checks.append(('Crosswind ≤ 15kt', crosswind <= 15))
-    restricted_checks.append(('Tailwind ≤ 5kt', tailwind <= 5))
-    result['checks']['RESTRICTED'] = restricted_checks
-    
-    if all(check[1] for check in restricted_checks):
-        result['phase'] = 'RESTRICTED'
-        result['restrictions'] = {'solo_cadets': True, 'solo_note': 'Post-IIC only', 'first_solo': True}
-        return result
+    app_minimums is ((visibility_m, ceiling_ft), ...) per approach. Defaults to
+    2400m / 500ft when nothing lower is published.
+    """
+    min_vis_m = 2400
+    min_ceiling_ft = 500
+    for app_vis, app_ceil in app_minimums:
+        min_vis_m = min(min_vis_m, app_vis)
+        min_ceiling_ft = min(min_ceiling_ft, app_ceil + 300)
+    return min_vis_m, min_ceiling_ft
+
+
+@lru_cache(maxsize=256)
+def _evaluate_phase_tiers(vis_m, lowest_cloud_for_phase, lowest_cloud, lowest_sct_plus,
+                          ceiling, effective_wind, crosswind, tailwind, elevation_ft,
+                          clear_no_clouds, ifr_minima):
+    """Walk UNRESTRICTED → IFR and return the first passing tier.
     
-    # FS VFR: No cloud below 5000ft AMSL (= fs_vfr_cloud_agl AGL)
-    fs_vfr_checks = []
-    fs_vfr_checks.append(('Vis ≥ 5km', vis_km is not None and vis_km >= 5))
-    fs_vfr_checks.append((f'No cloud < 5000ft AMSL ({fs_vfr_cloud_agl}ft AGL)',
-                           lowest_cloud_for_phase is None or lowest_cloud_for_phase >= fs_vfr_cloud_agl))
-    fs_vfr_checks.append(('Total wind ≤ 25kt', effective_wind <= 25))
-    fs_vfr_checks.append(('Crosswind ≤ 15kt', crosswind <= 15))
-    fs_vfr_checks.append(('Tailwind ≤ 5kt', tailwind <= 5))
-    result['checks']['FS VFR'] = fs_vfr_checks
-    
-    if all(check[1] for check in fs_vfr_checks):
-        result['phase'] = 'FS VFR'
-        result['restrictions'] = {'solo_cadets': False, 'solo_note': 'Not authorized', 'first_solo': True}
-        return result
+    Pure function of scalar weather summaries, so repeat evaluations of the
+    same conditions (same METAR, different alternates/options) are memoized.
+    
+    Returns (phase, restrictions, checks) where checks is a tuple of
+    (phase, ((label, passed), ...)) for every tier evaluated. restrictions
+    is shared; callers must copy it.
+    """
+    vis_km = vis_m / 1000 if vis_m else None
+    cavok_guarantee_agl = 5000  # CAVOK/NSC definition: no cloud below 5000ft AGL
+    checks = []
+    
+    # UNRESTRICTED / RESTRICTED / FS VFR share one shape — see PHASE_TABLE.
+    # CAVOK/NSC cannot satisfy "Max FEW above" if threshold > 5000ft AGL.
+    for row, labels in zip(PHASE_TABLE, _PHASE_TIER_LABELS):
+        (phase, min_vis_km, cloud_amsl, max_cover,
+         max_wind, max_xwind, max_tail, restrictions) = row
+        vis_ok = vis_km is not None and vis_km >= min_vis_km
+        wind_ok = effective_wind <= max_wind
+        xwind_ok = crosswind <= max_xwind
+        tail_ok = tailwind <= max_tail
+        
+        cloud_agl = cloud_amsl - elevation_ft
+        cloud_ok = lowest_cloud_for_phase is None or lowest_cloud_for_phase >= cloud_agl
+        layer_ok = True
+        if max_cover:
+            # FEW only → nothing SCT+ anywhere; SCT allowed → no BKN/OVC anywhere
+            worst_layer = lowest_sct_plus if max_cover == 'FEW' else ceiling
+            layer_ok = (worst_layer is None and
+                        (lowest_cloud is None or lowest_cloud >= cloud_agl))
+            if max_cover == 'FEW' and clear_no_clouds and cloud_agl > cavok_guarantee_agl:
+                layer_ok = False
+        
+        vis_label, wind_label, xwind_label, tail_label = labels
+        tier_checks = [
+            (vis_label, vis_ok),
+            (f'No cloud < {cloud_amsl}ft AMSL ({cloud_agl}ft AGL)', cloud_ok),
+        ]
+        if max_cover:
+            tier_checks.append((f'Max {max_cover} above {cloud_amsl}ft AMSL', layer_ok))
+        tier_checks.append((wind_label, wind_ok))
+        tier_checks.append((xwind_label, xwind_ok))
+        tier_checks.append((tail_label, tail_ok))
+        checks.append((phase, tuple(tier_checks)))
+        
+        if vis_ok and cloud_ok and layer_ok and wind_ok and xwind_ok and tail_ok:
+            return phase, restrictions, tuple(checks)
+    
+    # VFR/IFR share wind limits
+    wind_ok = effective_wind <= 30
+    xwind_ok = crosswind <= 24
+    tail_ok = tailwind <= 10
     
     # VFR: Ceiling ≥ 1500ft, Vis ≥ 5km
-    vfr_checks = []
-    vfr_checks.append(('Vis ≥ 5km', vis_km is not None and vis_km >= 5))
-    vfr_checks.append(('Ceiling ≥ 1500ft', ceiling is None or ceiling >= 1500))
-    vfr_checks.append(('Total wind ≤ 30kt', effective_wind <= 30))
-    vfr_checks.append(('Crosswind ≤ 24kt', crosswind <= 24))
-    vfr_checks.append(('Tailwind ≤ 10kt', tailwind <= 10))
-    result['checks']['VFR'] = vfr_checks
-    
-    if all(check[1] for check in vfr_checks):
-        result['phase'] = 'VFR'
-        result['restrictions'] = {'solo_cadets': False, 'first_solo': False}
-        return result
+    vis_ok = vis_km is not None and vis_km >= 5
+    ceiling_ok = ceiling is None or ceiling >= 1500
+    checks.append(('VFR', (
+        ('Vis ≥ 5km', vis_ok),
+        ('Ceiling ≥ 1500ft', ceiling_ok),
+        ('Total wind ≤ 30kt', wind_ok),
+        ('Crosswind ≤ 24kt', xwind_ok),
+        ('Tailwind ≤ 10kt', tail_ok),
+    )))
+    
+    if vis_ok and ceiling_ok and wind_ok and xwind_ok and tail_ok:
+        return 'VFR', _INSTRUMENT_RESTRICTIONS, tuple(checks)
     
     # IFR: Above approach minimums + 300ft ceiling
-    approaches = airfield_data.get('OEKF', {}).get('approaches', [])
-    min_vis_m = 2400
-    min_ceiling_ft = 500
-    
-    if approaches:
-        for app in approaches:
-            app_vis = app['minimums'].get('visibility_m', 800)
-            app_ceil = app['minimums'].get('ceiling_ft', 200)
-            min_vis_m = min(min_vis_m, app_vis)
-            min_ceiling_ft = min(min_ceiling_ft, app_ceil + 300)
-    
-    ifr_checks = []
-    ifr_checks.append((f'Vis ≥ {min_vis_m}m', vis_m is not None and vis_m >= min_vis_m))
-    ifr_checks.append((f'Ceiling ≥ {min_ceiling_ft}ft', ceiling is None or ceiling >= min_ceiling_ft))
-    ifr_checks.append(('Total wind ≤ 30kt', effective_wind <= 30))
-    ifr_checks.append(('Crosswind ≤ 24kt', crosswind <= 24))
-    ifr_checks.append(('Tailwind ≤ 10kt', tailwind <= 10))
-    result['checks']['IFR'] = ifr_checks
-    
-    if all(check[1] for check in ifr_checks):
-        result['phase'] = 'IFR'
-        result['restrictions'] = {'solo_cadets': False, 'first_solo': False}
-        return result
+    min_vis_m, min_ceiling_ft = ifr_minima
+    vis_ok = vis_m is not None and vis_m >= min_vis_m
+    ceiling_ok = ceiling is None or ceiling >= min_ceiling_ft
+    checks.append(('IFR', (
+        (f'Vis ≥ {min_vis_m}m', vis_ok),
+        (f'Ceiling ≥ {min_ceiling_ft}ft', ceiling_ok),
+        ('Total wind ≤ 30kt', wind_ok),
+        ('Crosswind ≤ 24kt', xwind_ok),
+        ('Tailwind ≤ 10kt', tail_ok),
+    )))
+    
+    if vis_ok and ceiling_ok and wind_ok and xwind_ok and tail_ok:
+        return 'IFR', _INSTRUMENT_RESTRICTIONS, tuple(checks)
     
     # HOLD
-    result['phase'] = 'HOLD'
-    result['reasons'] = ['Weather below IFR minimums']
-    result['restrictions'] = {'solo_cadets': False, 'first_solo': False, 'note': 'Recover only - no takeoffs'}
-    
-    return result
+    return 'HOLD', _HOLD_RESTRICTIONS, tuple(checks)
 
 
 def _taf_cache_path(icao: str) -> str:
@@ -1173,8 +1420,26 @@ def _taf_cache_path(icao: str) -> str:
     return os.path.join(TAF_CACHE_DIR, f"{icao.upper()}.taf")
 
 
+def _taf_parsed_cache_path(icao: str) -> str:
+    """Return the parsed-TAF sidecar path for an ICAO code."""
+    return os.path.join(TAF_CACHE_DIR, f"{icao.upper()}.parsed.json")
+
+
+def _taf_etag_path(icao: str) -> str:
+    """Return the ETag sidecar path for an ICAO code."""
+    return os.path.join(TAF_CACHE_DIR, f"{icao.upper()}.etag")
+
+
 def _read_taf_cache(icao: str) -> Optional[str]:
-    """Read TAF from cache if it exists and is fresh (< 30 min old)."""
+    """Read TAF from cache if it exists and is fresh (< 30 min old).
+    
+    Checks the in-process cache first so repeat lookups in one run skip
+    the stat + read.
+    """
+    key = icao.upper()
+    hit = _TAF_MEM_CACHE.get(key)
+    if hit and time.time() - hit[0] < TAF_CACHE_EXPIRY_SECS:
+        return hit[1]
     path = _taf_cache_path(icao)
     try:
         stat = os.stat(path)
@@ -1183,61 +1448,312 @@ def _read_taf_cache(icao: str) -> Optional[str]:
             with open(path, 'r') as f:
                 data = f.read().strip()
                 if data:
+                    _TAF_MEM_CACHE[key] = (stat.st_mtime, data)
                     return data
     except (OSError, IOError):
         pass
     return None
 
 
-def _write_taf_cache(icao: str, taf_data: str) -> None:
-    """Write TAF data to cache file."""
+def _write_taf_cache(icao: str, taf_data: str, etag: Optional[str] = None) -> None:
+    """Write TAF data to cache file (plus the server ETag, if any)."""
+    _TAF_MEM_CACHE[icao.upper()] = (time.time(), taf_data)
     try:
         os.makedirs(TAF_CACHE_DIR, exist_ok=True)
-        path = _taf_cache_path(icao)
-        with open(path, 'w') as f:
-            f.write(taf_data)
+        _atomic_write(_taf_cache_path(icao), taf_data)
+        # Parsed sidecar — lets the next run skip the period regexes
+        taf = TAFParser(taf_data)
+        _TAF_PARSED_MEM_CACHE[icao.upper()] = taf
+        _atomic_write(_taf_parsed_cache_path(icao), json.dumps(taf.to_dict()))
+        if etag:
+            _atomic_write(_taf_etag_path(icao), etag)
+        elif os.path.exists(_taf_etag_path(icao)):
+            os.remove(_taf_etag_path(icao))  # Old validator no longer matches
     except (OSError, IOError):
         pass  # Cache write failure is non-fatal
 
 
+def _read_stale_taf_cache(icao: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return (taf, etag) from the cache regardless of age, for revalidation.
+    
+    Either value is None if missing.
+    """
+    try:
+        with open(_taf_cache_path(icao), 'r') as f:
+            data = f.read().strip() or None
+        with open(_taf_etag_path(icao), 'r') as f:
+            etag = f.read().strip() or None
+    except (OSError, IOError):
+        return None, None
+    return data, etag
+
+
+def _refresh_taf_cache(icao: str, taf_data: str) -> None:
+    """Mark a cached TAF fresh again after the server answered 304 Not Modified."""
+    _TAF_MEM_CACHE[icao.upper()] = (time.time(), taf_data)
+    for path in (_taf_cache_path(icao), _taf_parsed_cache_path(icao)):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+def _atomic_write(path: str, data: str) -> None:
+    """Write via a temp file + os.replace so readers never see a torn file.
+    
+    The temp name is unique per process and thread: cache files are written
+    from the alternate workers and TAF probe threads as well as main().
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, 'w') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except (OSError, IOError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _read_parsed_taf_cache(icao: str, taf_string: str) -> Optional[TAFParser]:
+    """Return the cached parse of taf_string if the sidecar is fresh and matches.
+    
+    Freshness uses the same mtime check as the raw cache; the stored raw text
+    must match so an updated TAF is never served a stale parse, and the schema
+    version must match so a parse written by older parser code is ignored.
+    """
+    path = _taf_parsed_cache_path(icao)
+    try:
+        stat = os.stat(path)
+        if time.time() - stat.st_mtime >= TAF_CACHE_EXPIRY_SECS:
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, IOError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('schema') != TAF_PARSED_SCHEMA_VERSION:
+        return None
+    if data.get('raw') != taf_string.strip().upper():
+        return None
+    return TAFParser.from_dict(data)
+
+
+def parse_taf_cached(icao: str, taf_string: str, use_cache: bool = True) -> TAFParser:
+    """Parse a TAF, reusing the cached parse for this ICAO when available.
+    
+    A parser already built in this process for the same raw text is always
+    reused (it can't be stale); use_cache only gates the on-disk sidecar.
+    """
+    key = icao.upper()
+    raw = taf_string.strip().upper()  # Normalised once, as TAFParser stores it
+    taf = _TAF_PARSED_MEM_CACHE.get(key)
+    if taf is not None and taf.raw == raw:
+        return taf
+    taf = _read_parsed_taf_cache(icao, raw) if use_cache else None
+    if taf is None:
+        taf = TAFParser(raw)
+    _TAF_PARSED_MEM_CACHE[key] = taf
+    return taf
+
+
+def get_parsed_taf(icao: str, aliases: list = None,
+                   use_cache: bool = True) -> Optional[TAFParser]:
+    """Fetch and parse the TAF for icao (None if unavailable).
+    
+    fetch_taf() serves repeat lookups from the in-process raw cache and
+    parse_taf_cached() returns the parser already built for that text, so
+    alternate checks and divert-fuel planning share one TAFParser per ICAO.
+    """
+    taf_string = fetch_taf(icao, aliases=aliases, use_cache=use_cache)
+    if not taf_string:
+        return None
+    return parse_taf_cached(icao, taf_string, use_cache=use_cache)
+
+
 def fetch_taf(icao: str, aliases: list = None, use_cache: bool = True) -> Optional[str]:
     """Fetch TAF from aviationweather.gov with caching and fallback sources.
     
     Tries ICAO aliases if primary returns empty.
-    Uses file-based cache (30 min expiry) unless use_cache=False.
+    Uses file-based cache (TAF_CACHE_EXPIRY_SECS, default 30 min). With
+    use_cache=False the cache is not read, but the fresh TAF is still written.
     Falls back to alternate URL if primary fails.
     """
-    codes_to_try = [icao] + (aliases or [])
+    # Common case is a bare ICAO: a fresh cache hit returns before any
+    # alias/probe bookkeeping is built
+    if use_cache:
+        cached = _read_taf_cache(icao)
+        if cached:
+            return cached
+    codes_to_try = (icao, *aliases) if aliases else (icao,)
     
-    # Check cache first (for primary code)
+    # Then the aliases' caches
     if use_cache:
-        for code in codes_to_try:
+        for code in codes_to_try[1:]:
             cached = _read_taf_cache(code)
             if cached:
                 return cached
     
-    # Primary + fallback URLs for each code
+    # Expired entries with a stored ETag are revalidated (If-None-Match)
+    # rather than re-downloaded — TAFs only change every few hours.
+    stale = {}
+    if use_cache:
+        for code in codes_to_try:
+            data, etag = _read_stale_taf_cache(code)
+            if data and etag:
+                stale[code] = (data, etag)
+    
+    # Codes in order: an alias is only used when the primary ICAO has no TAF.
+    # Each code's primary + fallback URLs are probed concurrently.
     for code in codes_to_try:
-        urls = [
-            f"https://aviationweather.gov/api/data/taf?ids={code}&format=raw",
-            f"https://aviationweather.gov/api/data/taf?ids={code}&format=raw&taf=true",
-        ]
-        
-        for url in urls:
-            try:
-                with urllib.request.urlopen(url, timeout=5) as response:
-                    data = response.read().decode('utf-8').strip()
-                    if data and not data.startswith('No TAF'):
-                        # Cache the result
-                        if use_cache:
-                            _write_taf_cache(code, data)
-                        return data
-            except (urllib.error.URLError, urllib.error.HTTPError, OSError):
-                continue
+        stale_data, stale_etag = stale.get(code, (None, None))
+        status, data, etag = _probe_taf_urls(code, stale_etag)
+        if status == 304 and stale_data:
+            data = stale_data
+            _refresh_taf_cache(code, data)
+        elif data:
+            # Cache the result — even with use_cache=False, so a forced
+            # refresh still warms the cache for the next run
+            _write_taf_cache(code, data, etag)
+        else:
+            continue
+        return data
     
     return None
 
 
+def _probe_taf_urls(code: str, etag: Optional[str] = None) -> Tuple[int, Optional[str], Optional[str]]:
+    """GET every _TAF_URLS endpoint for code at once → first usable (status, TAF, ETag).
+    
+    Usable means a 304 revalidation or a body that isn't "No TAF". Probes run
+    on daemon threads, so a straggler still inside its HTTP timeout/retries
+    is abandoned rather than joined when the CLI exits.
+    Returns (0, None, None) when no endpoint has a TAF.
+    """
+    results = queue.Queue()
+    for url in _TAF_URLS:
+        threading.Thread(target=_probe_url, args=(url.format(code), etag, results),
+                         daemon=True).start()
+    for _ in _TAF_URLS:
+        status, data, resp_etag = results.get()
+        if status == 304 or (data and not data.startswith('No TAF')):
+            return status, data, resp_etag
+    return 0, None, None
+
+
+def _probe_url(url: str, etag: Optional[str], results: 'queue.Queue') -> None:
+    """Thread body for _probe_taf_urls: always posts exactly one result."""
+    result = (0, None, None)
+    try:
+        result = _http_get(url, etag=etag)
+    finally:
+        results.put(result)
+
+
+def _http_get(url: str, timeout: float = 5,
+              etag: Optional[str] = None) -> Tuple[int, Optional[str], Optional[str]]:
+    """GET a URL. Returns (status, stripped body, response ETag).
+    
+    status is 0 on failure. If etag is given it is sent as If-None-Match and
+    a 304 comes back as (304, None, etag).
+    
+    Transient server errors (429/5xx) are retried with jittered exponential
+    backoff (HTTP_RETRY_BACKOFF_SECS × 2^n, capped). Connection errors are
+    not retried — if the host is unreachable, the next URL/alias wins.
+    Direct requests go over pooled keep-alive connections (see _pooled_get);
+    when a proxy applies (HTTP(S)_PROXY / no_proxy) or the server redirects,
+    the request goes through urllib, which handles both.
+    """
+    parts = urllib.parse.urlsplit(url)
+    path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+    headers = {'User-Agent': _HTTP_USER_AGENT}
+    if etag:
+        headers['If-None-Match'] = etag
+    direct = _http_direct(parts.scheme, parts.hostname or '')
+    for attempt in range(HTTP_RETRY_TOTAL + 1):
+        if attempt:
+            backoff = min(HTTP_RETRY_MAX_SLEEP_SECS,
+                          HTTP_RETRY_BACKOFF_SECS * (2 ** (attempt - 1)))
+            time.sleep(backoff + random.uniform(0, HTTP_RETRY_JITTER_SECS))
+        try:
+            if direct:
+                status, body, resp_etag = _pooled_get(parts.scheme, parts.netloc,
+                                                      path, headers, timeout)
+                if status in _HTTP_REDIRECT_STATUS:
+                    direct = False
+            if not direct:
+                status, body, resp_etag = _urllib_get(url, headers, timeout)
+        except (http.client.HTTPException, OSError, UnicodeError):
+            return 0, None, None
+        if status == 304:
+            return 304, None, etag
+        if 200 <= status < 300:
+            return status, body.decode('utf-8').strip(), resp_etag
+        if status not in HTTP_RETRY_STATUS:
+            return 0, None, None
+    return 0, None, None
+
+
+def _http_direct(scheme: str, host: str) -> bool:
+    """True when no proxy applies to host, so the keep-alive pool can be used."""
+    return scheme not in urllib.request.getproxies() or bool(urllib.request.proxy_bypass(host))
+
+
+def _urllib_get(url: str, headers: dict, timeout: float) -> Tuple[int, bytes, Optional[str]]:
+    """One GET through urllib (proxies, redirects) → (status, body, ETag)."""
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read(), response.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        return e.code, b'', e.headers.get('ETag') if e.headers else None
+
+
+def _pooled_get(scheme: str, host: str, path: str, headers: dict,
+                timeout: float) -> Tuple[int, bytes, Optional[str]]:
+    """One GET over a pooled keep-alive connection → (status, body, ETag).
+    
+    A reused connection the server has since closed fails on first use; the
+    request is then repeated on the next idle or a fresh connection. Other
+    errors (including timeouts, so the wait isn't doubled) propagate.
+    """
+    key = (scheme, host)
+    while True:
+        with _HTTP_POOL_LOCK:
+            idle = _HTTP_POOL.get(key)
+            conn = idle.pop() if idle else None
+        reused = conn is not None
+        if reused:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        elif scheme == 'https':
+            conn = http.client.HTTPSConnection(host, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, timeout=timeout)
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            if reused and isinstance(e, _HTTP_STALE_CONN_ERRORS):
+                continue
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            with _HTTP_POOL_LOCK:
+                idle = _HTTP_POOL.setdefault(key, [])
+                if len(idle) < HTTP_POOL_MAXSIZE:
+                    idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status, body, response.getheader('ETag')
+
+
 def select_runway(metar: METARParser, airfield_data: dict, icao: str) -> Tuple[str, int]:
     """
     Select most likely runway based on wind.
@@ -1257,27 +1773,67 @@ def select_runway(metar: METARParser, airfield_data: dict, icao: str) -> Tuple[s
         return runways[0]['id'], runways[0]['heading']
     
     # Find runway most aligned with wind (land into wind)
-    best_runway = None
-    best_heading = 0
-    best_diff = 180
+    best_idx = _best_runway_idx(_runway_headings(airfield_data[icao]), metar.wind_dir)
+    if best_idx is None:
+        return "Unknown", 0
+    return runways[best_idx]['id'], runways[best_idx]['heading']
+
+
+def _runway_headings(airfield: dict) -> Tuple[int, ...]:
+    """Return the airfield's runway headings as a tuple.
     
-    for rwy in runways:
-        # For landing, we want runway heading close to wind direction
-        diff = abs(rwy['heading'] - metar.wind_dir)
-        if diff > 180:
-            diff = 360 - diff
-        
+    Built fresh on every call so edited runway data is never stale; the
+    tuple is the hashable key that lets _best_runway_idx() memoise the
+    wind lookup (select_runway, and once per TAF period in
+    check_alternate_suitability).
+    """
+    return tuple(rwy['heading'] for rwy in airfield.get('runways', []))
+
+
+def _runway_by_id(airfield: dict) -> Dict[str, dict]:
+    """Return {runway id: runway dict} for the airfield.
+    
+    First runway wins if an id is repeated, matching a linear scan. Built
+    per call and never stored on the config, so edits are always seen.
+    """
+    by_id: Dict[str, dict] = {}
+    for rwy in airfield.get('runways', []):
+        by_id.setdefault(rwy['id'], rwy)
+    return by_id
+
+
+@lru_cache(maxsize=1024)
+def _best_runway_idx(headings: Tuple[int, ...], wind_dir: int) -> Optional[int]:
+    """Index of the heading closest to wind_dir (360° wrap), first wins on ties.
+    
+    Returns None if no runway is within 180° (only possible with a single
+    runway pointing exactly downwind). Cached: headings come from
+    _runway_headings() and reported winds are in 10° steps,
+    so the TAF periods of every alternate hit a small table.
+    """
+    best_idx = None
+    best_diff = 180
+    for i, heading in enumerate(headings):
+        diff = _angdiff(heading, wind_dir)
         if diff < best_diff:
             best_diff = diff
-            best_runway = rwy['id']
-            best_heading = rwy['heading']
-    
-    return best_runway or "Unknown", best_heading
+            best_idx = i
+    return best_idx
 
 
 def _approach_navaid_required(approach: dict) -> Optional[str]:
     """Return the navaid type required for an approach, or None."""
-    app_type = approach.get('type', '').upper()
+    return _navaid_for_approach_type(approach.get('type', ''))
+
+
+@lru_cache(maxsize=64)
+def _navaid_for_approach_type(approach_type: str) -> Optional[str]:
+    """_approach_navaid_required() by type string, cached — airfields share a handful of types.
+    
+    Cached on the string rather than on the approach dict so approach dicts
+    (which appear in --json output) stay free of bookkeeping keys.
+    """
+    app_type = approach_type.upper()
     if 'ILS' in app_type:
         return 'ILS'
     if 'VOR' in app_type:
@@ -1428,12 +1984,11 @@ def apply_service_impacts(impacts: list, phase_result: dict) -> list:
     Modifies phase_result in place.
     """
     warnings = []
-    phase_rank = {'RECALL': 6, 'HOLD/RECALL': 6, 'HOLD': 5, 'IFR': 4, 'VFR': 3, 'FS VFR': 2, 'RESTRICTED': 1, 'UNRESTRICTED': 0}
 
     for impact in impacts:
         if impact['phase_impact']:
-            impact_rank = phase_rank.get(impact['phase_impact'], 0)
-            current_rank = phase_rank.get(phase_result['phase'], 0)
+            impact_rank = _SERVICE_PHASE_RANK.get(impact['phase_impact'], 0)
+            current_rank = _SERVICE_PHASE_RANK.get(phase_result['phase'], 0)
 
             if impact['phase_impact'] in ('HOLD', 'HOLD/RECALL', 'RECALL') and impact_rank > current_rank:
                 phase_result['phase'] = impact['phase_impact']
@@ -1445,8 +2000,7 @@ def apply_service_impacts(impacts: list, phase_result: dict) -> list:
                     'note': f"{impact['service']} unavailable"
                 }
             elif impact['phase_impact'] == 'VFR':
-                solo_phases = ['UNRESTRICTED', 'RESTRICTED', 'FS VFR']
-                if phase_result['phase'] in solo_phases:
+                if phase_result['phase'] in _SOLO_PHASES:
                     phase_result['phase'] = 'VFR'
                     phase_result['restrictions'] = {
                         'solo_cadets': False, 'first_solo': False,
@@ -1455,21 +2009,210 @@ def apply_service_impacts(impacts: list, phase_result: dict) -> list:
                 phase_result['restrictions']['solo_cadets'] = False
                 phase_result['restrictions']['first_solo'] = False
 
-            warnings.append(f"🔧 {impact['service']}: {impact['action']} ({impact['ref']})")
-        else:
-            warnings.append(f"🔧 {impact['service']}: {impact['action']} ({impact['ref']})")
+        warnings.append(_SERVICE_WARN_FMT.format(**impact))
 
     return warnings
 
 
+def _period_wind_components(periods: list, runways: List[dict],
+                            headings: Tuple[int, ...]) -> List[Tuple[dict, float, float]]:
+    """Best runway, crosswind and tailwind for every TAF period in one pass.
+    
+    Runway choice is memoised by _best_runway_idx; components come from
+    calculate_wind_components. No wind direction → first runway, full
+    effective wind as crosswind.
+    """
+    out = []
+    for _, period in periods:
+        wind_dir = period.get('wind_dir')
+        wind_speed = period.get('wind_speed', 0)
+        wind_gust = period.get('wind_gust')
+        effective_wind = wind_gust if wind_gust else wind_speed
+        
+        best_idx = None if wind_dir is None else _best_runway_idx(headings, wind_dir)
+        runway = runways[best_idx] if best_idx is not None else runways[0]
+        
+        if wind_dir is not None and effective_wind is not None:
+            crosswind, headwind = calculate_wind_components(
+                wind_dir, effective_wind, runway['heading'])
+            tailwind = abs(headwind) if headwind < 0 else 0
+        else:
+            crosswind = effective_wind if effective_wind is not None else 0
+            tailwind = 0
+        out.append((runway, crosswind, tailwind))
+    return out
+
+
+def _alternate_minimums(approach: dict) -> Tuple[int, int]:
+    """FOB 18-3e(2) alternate minimums (vis m, ceiling ft) for an approach.
+    
+    max(3000m, IAP vis + 1600m) and max(1000ft, IAP ceiling + 500ft).
+    """
+    mins = approach.get('minimums', {})
+    return (max(3000, mins.get('visibility_m', 800) + 1600),
+            max(1000, mins.get('ceiling_ft', 200) + 500))
+
+
+def _render_warnings(warnings: List[Tuple[str, dict]]) -> List[str]:
+    """Format main()'s (code, params) warnings via _WARN_FMT."""
+    return [_WARN_FMT[code].format(**params) for code, params in warnings]
+
+
+def _json_default(obj):
+    """json.dump() fallback: weather code sets serialise as sorted lists."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _notam_module():
+    """Import notam_checker on first use (only needed when NOTAMs are checked)."""
+    global _NOTAM_MODULE
+    if _NOTAM_MODULE is None:
+        import notam_checker
+        _NOTAM_MODULE = notam_checker
+    return _NOTAM_MODULE
+
+
+def _notam_impacts(icaos: List[str], notam_results: Optional[dict]) -> Dict[str, dict]:
+    """Per-alternate NOTAM impact, computed once up front: {icao: impact}."""
+    impacts = {}
+    if not notam_results or notam_results.get('status') != 'ok':
+        return impacts
+    for icao in icaos:
+        try:
+            impacts[icao] = _notam_module().get_notam_impact_on_alternate(icao, notam_results)
+        except Exception:
+            pass
+    return impacts
+
+
+def _evaluate_alternate(icao: str, airfield_data: dict, metar: METARParser,
+                        eff_wind: int, notam_impact: Optional[dict], use_cache: bool = True,
+                        solo: bool = False, opposite: bool = False) -> dict:
+    """Fetch, assess and fuel-plan one alternate (TAF, NOTAM impact, divert fuel).
+    
+    Self-contained so main() can run every alternate concurrently; returns the
+    alt_result dict shown in text/JSON output. eff_wind is the METAR's effective
+    wind, computed once by the caller; notam_impact is this alternate's entry
+    from _notam_impacts() (None when NOTAMs weren't checked).
+    """
+    # Fetch TAF for alternate (try ICAO aliases if primary empty)
+    aliases = airfield_data.get(icao, {}).get('icao_aliases', [])
+    alt_taf = get_parsed_taf(icao, aliases=aliases, use_cache=use_cache)
+    alt_taf_str = alt_taf.raw if alt_taf else None
+    
+    suitability = check_alternate_suitability(
+        icao, alt_taf_str, airfield_data, 
+        metar.wind_dir, eff_wind,
+        use_cache=use_cache,
+        notam_impact=notam_impact,
+        taf=alt_taf
+    )
+    
+    # Apply NOTAM-level disqualifiers (AD closed, all runways closed)
+    if notam_impact:
+        reasons = suitability.setdefault('reasons', [])
+        warns = suitability.setdefault('warnings', [])
+        try:
+            if not notam_impact['suitable']:
+                suitability['suitable'] = False
+                reasons.insert(0, 'NOTAM: Aerodrome closed')
+    
+            if notam_impact.get('closed_runways'):
+                # Keys view is set-comparable without building another set
+                ad_rwys = _runway_by_id(airfield_data.get(icao, {})).keys()
+                closed = notam_impact['closed_runways']
+                closed_ids = {part for part in _RWY_SPLIT_RE.split('/'.join(closed).strip()) if part}
+    
+                if ad_rwys and ad_rwys <= closed_ids:
+                    suitability['suitable'] = False
+                    reasons.insert(0, f"NOTAM: All runways closed ({', '.join(closed)})")
+    
+                for cr in closed:
+                    warns.append(f"NOTAM: RWY {cr} closed")
+    
+            for key, trigger, msg in _NOTAM_WARNING_TABLE:
+                if bool(notam_impact.get(key, not trigger)) == trigger:
+                    warns.append(msg)
+        except Exception:
+            pass
+    
+    # Calculate fuel
+    fuel_lbs, fuel_explanation = calculate_divert_fuel(
+        icao, airfield_data, 
+        solo=solo,
+        opposite=opposite,
+        oekf_metar=metar,
+        alt_taf=alt_taf
+    )
+    
+    alt_result = {
+        'icao': icao,
+        'name': airfield_data[icao]['name'],
+        'suitable': suitability['suitable'],
+        **{key: suitability.get(key) for key in ('runway', 'crosswind', 'tailwind', 'approach')},
+        'fuel_lbs': fuel_lbs,
+        'fuel_explanation': fuel_explanation,
+        'reasons': suitability.get('reasons', []),
+        'warnings': suitability.get('warnings', []),
+        'taf_raw': alt_taf_str,
+    }
+    
+    return alt_result
+
+
+def check_alternates(icaos: List[str], airfield_data: dict, metar: METARParser,
+                     notam_impacts: Optional[Dict[str, dict]] = None, use_cache: bool = True,
+                     solo: bool = False, opposite: bool = False) -> Tuple[List[dict], Optional[dict]]:
+    """
+    Evaluate alternates in priority order, fetching their TAFs concurrently.
+    
+    Alternates run through _evaluate_alternate() on a thread pool in batches
+    of ALTERNATE_BATCH_SIZE, so a batch costs one TAF round-trip rather than
+    one per airfield (fetches share the keep-alive connection pool). Results
+    are walked in priority order and evaluation stops after the first batch
+    that yields a suitable alternate — lower priorities aren't needed.
+    
+    Returns:
+        (checked alternates in priority order, best suitable alternate or None)
+    """
+    notam_impacts = notam_impacts or {}
+    eff_wind = metar.get_effective_wind_speed()
+    checked = []
+    best = None
+    if not icaos:
+        return checked, best
+    with ThreadPoolExecutor(max_workers=min(ALTERNATE_BATCH_SIZE, len(icaos))) as executor:
+        for start in range(0, len(icaos), ALTERNATE_BATCH_SIZE):
+            futures = [
+                executor.submit(_evaluate_alternate, icao, airfield_data, metar, eff_wind,
+                                notam_impacts.get(icao), use_cache=use_cache,
+                                solo=solo, opposite=opposite)
+                for icao in icaos[start:start + ALTERNATE_BATCH_SIZE]
+            ]
+            for future in futures:
+                alt_result = future.result()
+                checked.append(alt_result)
+                if alt_result['suitable'] and not best:
+                    best = alt_result
+            if best:
+                break
+    return checked, best
+
+
 def check_alternate_suitability(icao: str, taf_string: Optional[str], 
                                 airfield_data: dict, oekf_wind_dir: int = None, 
                                 oekf_wind_speed: int = None,
                                 use_cache: bool = True,
-                                notam_impact: dict = None) -> dict:
+                                notam_impact: dict = None,
+                                taf: Optional[TAFParser] = None) -> dict:
     """
     Check if alternate airfield is suitable per FOB 18-3.
     
+    Pass taf when the caller already holds the parsed TAF; otherwise it is
+    parsed from taf_string, or fetched when neither is given.
+    
     FOB 18-3e: Alternate must have:
       1. A published IAP suitable for the aircraft type (navaid must be serviceable)
       2. Actual/forecast weather ETA ±1hr (prevailing OR intermittent/TEMPO):
@@ -1495,11 +2238,14 @@ def check_alternate_suitability(icao: str, taf_string: Optional[str],
         result['reasons'].append('Airfield data not available')
         return result
     
-    # Fetch TAF if not provided
-    if not taf_string:
-        taf_string = fetch_taf(icao, use_cache=use_cache)
+    # Parse TAF, fetching it if not provided
+    if taf is None:
+        if taf_string:
+            taf = parse_taf_cached(icao, taf_string, use_cache=use_cache)
+        else:
+            taf = get_parsed_taf(icao, use_cache=use_cache)
     
-    if not taf_string:
+    if taf is None:
         # No TAF - use OEKF winds as estimate if available
         if oekf_wind_dir is not None and oekf_wind_speed is not None:
             result['warnings'].append('No TAF - using OEKF winds as estimate')
@@ -1508,9 +2254,7 @@ def check_alternate_suitability(icao: str, taf_string: Optional[str],
             result['reasons'].append('TAF not available')
             return result
     
-    # Parse TAF
-    if taf_string:
-        taf = TAFParser(taf_string)
+    if taf is not None:
         periods = taf.get_all_periods()
     else:
         # Create pseudo-period from OEKF winds
@@ -1530,6 +2274,7 @@ def check_alternate_suitability(icao: str, taf_string: Optional[str],
         result['suitable'] = False
         result['reasons'].append('No runway data')
         return result
+    headings = _runway_headings(airfield_data[icao])
     
     # FOB 18-3e(1): Must have a published IAP with serviceable navaid
     # Filter approaches to only those with serviceable navaids (per-runway checks)
@@ -1565,88 +2310,62 @@ def check_alternate_suitability(icao: str, taf_string: Optional[str],
             # No approaches defined at all — use generic minimums
             result['warnings'].append('No published IAP data — using generic minimums (1000ft/3000m)')
     
+    # Best usable approach per runway (same runway or reciprocal, else the
+    # first usable one) — resolved once rather than per TAF period
+    approach_by_rwy = {}
+    for rwy in runways:
+        for app in usable_approaches:
+            if app.get('runway') == rwy['id'] or app.get('runway') == rwy.get('reciprocal'):
+                approach_by_rwy[rwy['id']] = app
+                break
+        else:
+            if usable_approaches:
+                approach_by_rwy[rwy['id']] = usable_approaches[0]
+    minimums_by_rwy = {}
+    loc_only_warning = {}  # rwy id → warning, re-added for each period that uses it
+    for rwy_id, app in approach_by_rwy.items():
+        # ILS with glideslope U/S → LOC-only: raise minimums
+        # LOC-only typically adds ~200ft to ceiling and ~800m to vis
+        if 'ILS' in app.get('type', '').upper() and app.get('runway', '') in glideslope_degraded:
+            app_vis = app['minimums'].get('visibility_m', 800) + 800
+            app_ceil = app['minimums'].get('ceiling_ft', 200) + 200
+            minimums_by_rwy[rwy_id] = (max(3000, app_vis + 1600), max(1000, app_ceil + 500))
+            loc_only_warning[rwy_id] = f"GS U/S → LOC-only minimums for {app.get('runway', '?')}"
+        else:
+            minimums_by_rwy[rwy_id] = _alternate_minimums(app)
+    
     # Check each TAF period — ALL periods are hard checks per FOB 18-3
     # "prevailing or intermittently less than VMC"
     unsuitable_reasons = []
     
-    for period_type, period in periods:
-        # Select best runway for this period's wind
-        wind_dir = period.get('wind_dir')
-        wind_speed = period.get('wind_speed', 0)
-        wind_gust = period.get('wind_gust')
-        effective_wind = wind_gust if wind_gust else wind_speed
-        
-        if wind_dir is None:
-            runway = runways[0]
-        else:
-            best_diff = 180
-            runway = runways[0]
-            for rwy in runways:
-                diff = abs(rwy['heading'] - wind_dir)
-                if diff > 180:
-                    diff = 360 - diff
-                if diff < best_diff:
-                    best_diff = diff
-                    runway = rwy
-        
-        # Calculate wind components
-        if wind_dir is not None and effective_wind is not None:
-            crosswind, headwind = calculate_wind_components(wind_dir, effective_wind, runway['heading'])
-            tailwind = abs(headwind) if headwind < 0 else 0
-        else:
-            crosswind = effective_wind if effective_wind is not None else 0
-            headwind = 0
-            tailwind = 0
-        
+    period_winds = _period_wind_components(periods, runways, headings)
+    
+    for (period_type, period), (runway, crosswind, tailwind) in zip(periods, period_winds):
         # Wind limits
         if crosswind > 24:
             unsuitable_reasons.append(f'{period_type}: Crosswind {crosswind:.1f}kt > 24kt')
         if tailwind > 10:
             unsuitable_reasons.append(f'{period_type}: Tailwind {tailwind:.1f}kt > 10kt')
         
-        # FOB 18-3e(2): Weather minimums from usable approach
-        # Find best usable approach for this runway
-        min_vis_m = 3000
-        min_ceiling_ft = 1000
-        suitable_approach = None
-        
-        for app in usable_approaches:
-            if app.get('runway') == runway['id'] or app.get('runway') == runway.get('reciprocal'):
-                suitable_approach = app
-                break
-        
-        if not suitable_approach and usable_approaches:
-            suitable_approach = usable_approaches[0]
-        
-        if suitable_approach:
-            app_vis = suitable_approach['minimums'].get('visibility_m', 800)
-            app_ceil = suitable_approach['minimums'].get('ceiling_ft', 200)
-
-            # ILS with glideslope U/S → LOC-only: raise minimums
-            # LOC-only typically adds ~200ft to ceiling and ~800m to vis
-            if 'ILS' in suitable_approach.get('type', '').upper() \
-                    and suitable_approach.get('runway', '') in glideslope_degraded:
-                app_ceil += 200
-                app_vis += 800
-                result['warnings'].append(
-                    f"GS U/S → LOC-only minimums for {suitable_approach.get('runway', '?')}")
-
-            min_vis_m = max(3000, app_vis + 1600)
-            min_ceiling_ft = max(1000, app_ceil + 500)
+        # FOB 18-3e(2): Weather minimums from the runway's usable approach
+        # (resolved per runway above; generic 3000m/1000ft without one)
+        rwy_id = runway['id']
+        suitable_approach = approach_by_rwy.get(rwy_id)
+        min_vis_m, min_ceiling_ft = minimums_by_rwy.get(rwy_id, (3000, 1000))
+        if rwy_id in loc_only_warning:
+            result['warnings'].append(loc_only_warning[rwy_id])
         
         # Check visibility
         vis_m = period.get('visibility_m')
         if vis_m and vis_m < min_vis_m:
             unsuitable_reasons.append(f'{period_type}: Vis {vis_m}m < {min_vis_m}m')
         
-        # Check ceiling
-        for cloud in period.get('clouds', []):
-            if cloud['coverage'] in ['BKN', 'OVC']:
-                if cloud['height_ft'] < min_ceiling_ft:
-                    unsuitable_reasons.append(
-                        f'{period_type}: Ceiling {cloud["height_ft"]}ft < {min_ceiling_ft}ft'
-                    )
-                break
+        # Check ceiling (first BKN/OVC layer, precomputed at parse time)
+        ceiling_ft = period.get('ceiling_ft')
+        if ceiling_ft is not None and ceiling_ft < min_ceiling_ft:
+            unsuitable_reasons.append(
+                f'{period_type}: Ceiling {ceiling_ft}ft < {min_ceiling_ft}ft'
+            )
         
         # CB
         if period.get('has_cb'):
@@ -1734,34 +2453,65 @@ def calculate_divert_fuel(icao: str, airfield_data: dict, solo: bool = False,
     return fuel, explanation
 
 
+def _cloud_layer_str(cloud: dict) -> str:
+    """Cloud layer in report form: coverage + height in hundreds of ft (BKN030)."""
+    return f"{cloud['coverage']}{cloud['height_ft']//100:03d}"
+
+
+def _change_group_parts(group: dict) -> List[str]:
+    """Vis/cloud/wind fragments shown for one TAF BECMG or TEMPO group."""
+    parts = []
+    if group.get('visibility_m'):
+        parts.append(f"vis {group['visibility_m']}m")
+    parts.extend(_cloud_layer_str(c) for c in group.get('clouds') or ())
+    if group.get('wind_speed'):
+        parts.append(f"wind {group.get('wind_dir', '???')}/{group['wind_speed']}kt")
+    return parts
+
+
+def _format_resolved(resolved: dict) -> List[str]:
+    """Verbose-pipeline lines for one resolved worst-case summary."""
+    lines = []
+    if resolved['visibility_m'] is not None:
+        v = resolved['visibility_m']
+        lines.append(f"      Visibility: {v}m ({v/1000:.1f}km)")
+    if resolved['wind']:
+        w = resolved['wind']
+        d = f"{w['direction']:03d}°" if w.get('direction') is not None else "VRB"
+        g = f" G{w['gust']}" if w.get('gust') else ""
+        lines.append(f"      Wind: {d}/{w['speed']}kt{g}")
+    if resolved['clouds']:
+        cloud = ' '.join(_cloud_layer_str(c) + ('CB' if c.get('cb') else '')
+                         for c in resolved['clouds'])
+        lines.append(f"      Cloud: {cloud}")
+    if resolved['weather']:
+        lines.append(f"      Weather: {' '.join(sorted(resolved['weather']))}")
+    lines.append(f"      CB: {'YES' if resolved['has_cb'] else 'NO'}")
+    return lines
+
+
 def format_output(phase_result: dict, metar: METARParser, runway: str, 
                   alternate_required: bool, checked_alternates: List[dict] = None,
                   best_alternate: dict = None, taf: TAFParser = None, 
                   warnings: List[str] = None, show_checks: bool = False,
                   bird_info: dict = None, sortie_window: dict = None,
                   parse_warnings: List[str] = None, verbose: bool = False,
-                  element_pipeline: dict = None) -> str:
-    """Format human-readable output."""
+                  element_pipeline: dict = None, zulu_now: Optional[datetime] = None) -> str:
+    """Format human-readable output.
+    
+    zulu_now stamps the header (default: now); pass the run's reference time
+    so several rendered reports share one timestamp.
+    """
     output = []
     
     # Current Zulu time stamp
-    zulu_now = datetime.now(timezone.utc)
+    if zulu_now is None:
+        zulu_now = datetime.now(timezone.utc)
     output.append(f"🕐 {zulu_now.strftime('%d %b %Y %H%MZ')}")
     output.append("")
     
     # Header
-    phase_emoji = {
-        'UNRESTRICTED': '🟢',
-        'RESTRICTED': '🟡',
-        'FS VFR': '🟡',
-        'VFR': '🟠',
-        'IFR': '🔴',
-        'HOLD': '⛔',
-        'HOLD/RECALL': '⛔🚨',
-        'RECALL': '🚨'
-    }
-    
-    emoji = phase_emoji.get(phase_result['phase'], '❓')
+    emoji = PHASE_EMOJI.get(phase_result['phase'], '❓')
     output.append(f"{emoji} KFAA Phase: {phase_result['phase']}")
     output.append("")
     
@@ -1798,31 +2548,27 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
             # Also show weather checks for the weather-determined phase
             if weather_phase in checks_dict:
                 output.append(f"  Weather checks ({weather_phase}):")
-                for check_name, passed in checks_dict[weather_phase]:
-                    check_emoji = "✅" if passed else "❌"
-                    output.append(f"    {check_emoji} {check_name}")
+                output.extend(f"    {_CHECK_EMOJI[passed]} {check_name}"
+                              for check_name, passed in checks_dict[weather_phase])
         else:
             # No capping — show the phase that matched, plus failed higher phases
             if actual_phase in checks_dict:
                 output.append(f"  {actual_phase}:")
-                for check_name, passed in checks_dict[actual_phase]:
-                    check_emoji = "✅" if passed else "❌"
-                    output.append(f"    {check_emoji} {check_name}")
+                output.extend(f"    {_CHECK_EMOJI[passed]} {check_name}"
+                              for check_name, passed in checks_dict[actual_phase])
             
             # Show failed higher phases (why we didn't get a better phase)
-            phase_order = ['UNRESTRICTED', 'RESTRICTED', 'FS VFR', 'VFR', 'IFR']
             try:
-                ap_idx = phase_order.index(actual_phase)
+                ap_idx = _PHASE_ORDER.index(actual_phase)
             except ValueError:
-                ap_idx = len(phase_order)
+                ap_idx = len(_PHASE_ORDER)
             
-            for phase_name in phase_order[:ap_idx]:
+            for phase_name in _PHASE_ORDER[:ap_idx]:
                 if phase_name in checks_dict and phase_name != actual_phase:
-                    failed = [(n, p) for n, p in checks_dict[phase_name] if not p]
+                    failed = [f"    ❌ {n}" for n, p in checks_dict[phase_name] if not p]
                     if failed:
                         output.append(f"  {phase_name}:")
-                        for check_name, passed in failed:
-                            output.append(f"    ❌ {check_name}")
+                        output.extend(failed)
         
         output.append("")
     
@@ -1842,53 +2588,13 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
         pe_str = ep['phase_end'].strftime('%H:%MZ')
         output.append(f"  Phase window [{now_str} → {pe_str}] — sources: METAR, WARNING, PIREP ({len(ep['phase_collection'])} elements):")
         output.append("    Resolved:")
-        pr = ep['phase_resolved']
-        if pr['visibility_m'] is not None:
-            v = pr['visibility_m']
-            output.append(f"      Visibility: {v}m ({v/1000:.1f}km)")
-        if pr['wind']:
-            w = pr['wind']
-            d = f"{w['direction']:03d}°" if w.get('direction') is not None else "VRB"
-            s = f"{w['speed']}kt"
-            g = f" G{w['gust']}" if w.get('gust') else ""
-            output.append(f"      Wind: {d}/{s}{g}")
-        if pr['clouds']:
-            parts = []
-            for c in pr['clouds']:
-                cs = f"{c['coverage']}{c['height_ft']//100:03d}"
-                if c.get('cb'):
-                    cs += 'CB'
-                parts.append(cs)
-            output.append(f"      Cloud: {' '.join(parts)}")
-        if pr['weather']:
-            output.append(f"      Weather: {' '.join(sorted(pr['weather']))}")
-        output.append(f"      CB: {'YES' if pr['has_cb'] else 'NO'}")
+        output.extend(_format_resolved(ep['phase_resolved']))
         output.append("")
 
         # OEKF full weather (incl TAF) — for alternate requirement
         output.append(f"  OEKF full weather [{now_str} → {pe_str}] — all sources ({len(ep['oekf_full_collection'])} elements):")
         output.append("    Resolved (used for alternate requirement):")
-        ar = ep['oekf_full_resolved']
-        if ar['visibility_m'] is not None:
-            v = ar['visibility_m']
-            output.append(f"      Visibility: {v}m ({v/1000:.1f}km)")
-        if ar['wind']:
-            w = ar['wind']
-            d = f"{w['direction']:03d}°" if w.get('direction') is not None else "VRB"
-            s = f"{w['speed']}kt"
-            g = f" G{w['gust']}" if w.get('gust') else ""
-            output.append(f"      Wind: {d}/{s}{g}")
-        if ar['clouds']:
-            parts = []
-            for c in ar['clouds']:
-                cs = f"{c['coverage']}{c['height_ft']//100:03d}"
-                if c.get('cb'):
-                    cs += 'CB'
-                parts.append(cs)
-            output.append(f"      Cloud: {' '.join(parts)}")
-        if ar['weather']:
-            output.append(f"      Weather: {' '.join(sorted(ar['weather']))}")
-        output.append(f"      CB: {'YES' if ar['has_cb'] else 'NO'}")
+        output.extend(_format_resolved(ep['oekf_full_resolved']))
         output.append(f"  Alternate airfield window: [{now_str} → {ep['alt_end'].strftime('%H:%MZ')}] (180min)")
         output.append("")
     
@@ -1903,15 +2609,8 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
     elif not cond['clouds']:
         cloud_str = "NSC" if 'NSC' in metar.raw else "SKC"
     else:
-        cloud_parts = []
-        for c in cond['clouds']:
-            cloud_str_part = f"{c['coverage']}{c['height_ft']//100:03d}"
-            if c.get('cb'):
-                cloud_str_part += 'CB'
-            elif c.get('type'):
-                cloud_str_part += c['type']
-            cloud_parts.append(cloud_str_part)
-        cloud_str = " ".join(cloud_parts)
+        cloud_str = " ".join(_cloud_layer_str(c) + ('CB' if c.get('cb') else c.get('type') or '')
+                             for c in cond['clouds'])
     
     if cond['wind_dir'] is not None:
         wind_str = f"{cond['wind_dir']:03d}°/{cond['wind_speed']}kt"
@@ -1940,8 +2639,8 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
     solo_note = restrictions.get('solo_note', '')
     first_solo_ok = restrictions.get('first_solo', False)
     
-    solo_emoji = "✅" if solo_ok else "❌"
-    first_solo_emoji = "✅" if first_solo_ok else "❌"
+    solo_emoji = _CHECK_EMOJI[bool(solo_ok)]
+    first_solo_emoji = _CHECK_EMOJI[bool(first_solo_ok)]
     
     output.append(f"  Solo cadets: {solo_emoji}" + (f" ({solo_note})" if solo_note else ""))
     output.append(f"  1st Solo: {first_solo_emoji}")
@@ -1979,24 +2678,14 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
         
         # Check for improvement or deterioration
         base_vis = taf.base_period.get('visibility_m', 10000) if taf.base_period else 10000
-        base_ceiling = None
-        
-        if taf.base_period:
-            for cloud in taf.base_period.get('clouds', []):
-                if cloud['coverage'] in ['BKN', 'OVC']:
-                    base_ceiling = cloud['height_ft']
-                    break
+        base_ceiling = taf.base_period.get('ceiling_ft') if taf.base_period else None
         
         trend = "STABLE"
         
         # Check BECMG periods
         for becmg in taf.becmg_periods:
             becmg_vis = becmg.get('visibility_m', 10000)
-            becmg_ceiling = None
-            for cloud in becmg.get('clouds', []):
-                if cloud['coverage'] in ['BKN', 'OVC']:
-                    becmg_ceiling = cloud['height_ft']
-                    break
+            becmg_ceiling = becmg.get('ceiling_ft')
             
             if becmg_vis is not None and base_vis is not None:
                 if becmg_vis < base_vis:
@@ -2057,7 +2746,7 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
                 if alt['icao'] == best_alternate.get('icao'):
                     continue  # Skip the selected one
                 
-                status = "✅" if alt.get('suitable') else "❌"
+                status = _CHECK_EMOJI[bool(alt.get('suitable'))]
                 reason = alt.get('reasons', [''])[0] if alt.get('reasons') else ''
                 label = reason if reason else 'Suitable'
                 output.append(f"    {status} {alt['icao']} - {label}")
@@ -2072,13 +2761,13 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
     if verbose and checked_alternates:
         output.append("📋 Alternate Assessment Inputs:")
         for alt in checked_alternates:
-            status = "✅" if alt.get('suitable') else "❌"
+            status = _CHECK_EMOJI[bool(alt.get('suitable'))]
             output.append(f"  {status} {alt['icao']} ({alt['name']}):")
             
             taf_raw = alt.get('taf_raw')
             if taf_raw:
                 # Parse the TAF to show structured conditions
-                alt_taf = TAFParser(taf_raw)
+                alt_taf = parse_taf_cached(alt['icao'], taf_raw)
                 bp = alt_taf.base_period
                 if bp:
                     vis_str = f"{bp['visibility_m']}m" if bp.get('visibility_m') else "N/A"
@@ -2090,40 +2779,18 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
                     elif bp.get('wind_speed') is not None:
                         wind_str = f"VRB/{bp['wind_speed']}kt"
                     
-                    cloud_parts = []
-                    for c in bp.get('clouds', []):
-                        s = f"{c['coverage']}{c['height_ft']//100:03d}"
-                        if c.get('type'):
-                            s += c['type']
-                        cloud_parts.append(s)
-                    cloud_str = " ".join(cloud_parts) if cloud_parts else "NSC/SKC"
+                    cloud_str = " ".join(_cloud_layer_str(c) + (c.get('type') or '')
+                                         for c in bp.get('clouds', [])) or "NSC/SKC"
                     
                     output.append(f"    TAF base: Vis {vis_str} | Cloud: {cloud_str} | Wind: {wind_str}")
                 
                 # Show BECMG/TEMPO periods
-                for becmg in alt_taf.becmg_periods:
-                    parts = []
-                    if becmg.get('visibility_m'):
-                        parts.append(f"vis {becmg['visibility_m']}m")
-                    if becmg.get('clouds'):
-                        for c in becmg['clouds']:
-                            parts.append(f"{c['coverage']}{c['height_ft']//100:03d}")
-                    if becmg.get('wind_speed'):
-                        parts.append(f"wind {becmg.get('wind_dir', '???')}/{becmg['wind_speed']}kt")
-                    if parts:
-                        output.append(f"    BECMG: {', '.join(parts)}")
-                
-                for tempo in alt_taf.tempo_periods:
-                    parts = []
-                    if tempo.get('visibility_m'):
-                        parts.append(f"vis {tempo['visibility_m']}m")
-                    if tempo.get('clouds'):
-                        for c in tempo['clouds']:
-                            parts.append(f"{c['coverage']}{c['height_ft']//100:03d}")
-                    if tempo.get('wind_speed'):
-                        parts.append(f"wind {tempo.get('wind_dir', '???')}/{tempo['wind_speed']}kt")
-                    if parts:
-                        output.append(f"    TEMPO: {', '.join(parts)}")
+                for label, groups in (('BECMG', alt_taf.becmg_periods),
+                                      ('TEMPO', alt_taf.tempo_periods)):
+                    for group in groups:
+                        parts = _change_group_parts(group)
+                        if parts:
+                            output.append(f"    {label}: {', '.join(parts)}")
             else:
                 output.append(f"    TAF: not available")
             
@@ -2159,6 +2826,62 @@ def format_output(phase_result: dict, metar: METARParser, runway: str,
     return "\n".join(output)
 
 
+def load_airfield_data(data_file: Path) -> dict:
+    """Load and normalise airfield_data.json.
+    
+    The normalised dict is kept in-process keyed by path and file mtime, so
+    repeated evaluations in one process (batch re-runs, tests, wrappers)
+    skip the JSON parse and schema-v2 normalisation. Edits to the file are
+    picked up via the mtime.
+    
+    Raises FileNotFoundError if the file is missing.
+    """
+    key = str(data_file)
+    mtime = os.stat(data_file).st_mtime
+    hit = _AIRFIELD_DATA_CACHE.get(key)
+    if hit and hit[0] == mtime:
+        return hit[1]
+    
+    with open(data_file) as f:
+        airfield_data = json.load(f)
+    
+    # Schema v2 compatibility: flatten 'airfields' dict to top level
+    if 'airfields' in airfield_data:
+        for icao, af_data in airfield_data['airfields'].items():
+            airfield_data[icao] = af_data
+        # Normalize runway headings from "149/329" string to individual runway dicts
+        for icao in list(airfield_data.get('airfields', {}).keys()):
+            af = airfield_data[icao]
+            new_runways = []
+            for rwy in af.get('runways', []):
+                if '/' in str(rwy.get('id', '')):
+                    ids = rwy['id'].split('/')
+                    hdgs = str(rwy.get('heading', '')).split('/')
+                    if len(ids) == 2 and len(hdgs) == 2:
+                        new_runways.append({
+                            'id': ids[0], 'heading': int(hdgs[0]),
+                            'reciprocal': ids[1]
+                        })
+                        new_runways.append({
+                            'id': ids[1], 'heading': int(hdgs[1]),
+                            'reciprocal': ids[0]
+                        })
+                    else:
+                        new_runways.append(rwy)
+                else:
+                    new_runways.append(rwy)
+            af['runways'] = new_runways
+    # Normalize divert_fuel keys: fuel_lbs -> base_fuel_lbs, bearing -> track_deg
+    for icao, fuel in airfield_data.get('divert_fuel', {}).items():
+        if 'fuel_lbs' in fuel and 'base_fuel_lbs' not in fuel:
+            fuel['base_fuel_lbs'] = fuel.pop('fuel_lbs')
+        if 'bearing' in fuel and 'track_deg' not in fuel:
+            fuel['track_deg'] = fuel.pop('bearing')
+    
+    _AIRFIELD_DATA_CACHE[key] = (mtime, airfield_data)
+    return airfield_data
+
+
 def _classify_input(text: str) -> str:
     """Auto-classify a weather input string as 'metar', 'taf', or 'pirep'.
     
@@ -2185,6 +2908,8 @@ def _classify_input(text: str) -> str:
 
 
 def main():
+    global TAF_CACHE_EXPIRY_SECS  # --cache-ttl override
+    
     parser = argparse.ArgumentParser(
         description='KFAA Flying Phase Determination',
         epilog='Input strings are auto-classified as METAR, TAF, or PIREP. '
@@ -2202,15 +2927,23 @@ def main():
     parser.add_argument('--checks', action='store_true', help='Show phase condition checks')
     parser.add_argument('--verbose', action='store_true', help='Show all weather inputs for phase and alternate determination')
     parser.add_argument('--json', action='store_true', help='Output in JSON format')
-    parser.add_argument('--no-cache', action='store_true', help='Bypass TAF cache')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore cached TAFs and fetch fresh (cache is still refreshed)')
+    parser.add_argument('--cache-ttl', dest='cache_ttl', type=int, default=None,
+                        help=f'TAF cache lifetime in minutes (default: {TAF_CACHE_EXPIRY_SECS // 60})')
     parser.add_argument('--no-notams', action='store_true', help='Skip NOTAM fetch (NOTAMs fetched by default)')
     parser.add_argument('--sortie-time', dest='sortie_time',
                         help='Sortie time in local (AST) HHmm format, e.g. "1030" for 10:30 local')
     parser.add_argument('--local-lookahead', dest='local_lookahead', type=int, default=60,
                         help='OEKF phase lookahead window in minutes (default: 60)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print a cProfile summary (top 30 by cumulative time) to stderr')
     
     args = parser.parse_args()
     
+    if args.cache_ttl is not None:
+        TAF_CACHE_EXPIRY_SECS = max(0, args.cache_ttl) * 60
+    
     # Auto-classify inputs
     metar_str = None
     taf_str = None
@@ -2247,45 +2980,11 @@ def main():
     data_file = script_dir / 'airfield_data.json'
     
     try:
-        with open(data_file) as f:
-            airfield_data = json.load(f)
+        airfield_data = load_airfield_data(data_file)
     except FileNotFoundError:
         print(f"Error: airfield_data.json not found at {data_file}", file=sys.stderr)
         sys.exit(1)
     
-    # Schema v2 compatibility: flatten 'airfields' dict to top level
-    if 'airfields' in airfield_data:
-        for icao, af_data in airfield_data['airfields'].items():
-            airfield_data[icao] = af_data
-        # Normalize runway headings from "149/329" string to individual runway dicts
-        for icao in list(airfield_data.get('airfields', {}).keys()):
-            af = airfield_data[icao]
-            new_runways = []
-            for rwy in af.get('runways', []):
-                if '/' in str(rwy.get('id', '')):
-                    ids = rwy['id'].split('/')
-                    hdgs = str(rwy.get('heading', '')).split('/')
-                    if len(ids) == 2 and len(hdgs) == 2:
-                        new_runways.append({
-                            'id': ids[0], 'heading': int(hdgs[0]),
-                            'reciprocal': ids[1]
-                        })
-                        new_runways.append({
-                            'id': ids[1], 'heading': int(hdgs[1]),
-                            'reciprocal': ids[0]
-                        })
-                    else:
-                        new_runways.append(rwy)
-                else:
-                    new_runways.append(rwy)
-            af['runways'] = new_runways
-    # Normalize divert_fuel keys: fuel_lbs -> base_fuel_lbs, bearing -> track_deg
-    for icao, fuel in airfield_data.get('divert_fuel', {}).items():
-        if 'fuel_lbs' in fuel and 'base_fuel_lbs' not in fuel:
-            fuel['base_fuel_lbs'] = fuel.pop('fuel_lbs')
-        if 'bearing' in fuel and 'track_deg' not in fuel:
-            fuel['track_deg'] = fuel.pop('bearing')
-    
     # Parse METAR
     metar = METARParser(args.metar)
     
@@ -2321,11 +3020,8 @@ def main():
     if args.runway:
         runway = args.runway.upper()
         # Find heading from data
-        runway_heading = 0
-        for rwy in airfield_data.get('OEKF', {}).get('runways', []):
-            if rwy['id'] == runway:
-                runway_heading = rwy['heading']
-                break
+        rwy = _runway_by_id(airfield_data.get('OEKF', {})).get(runway)
+        runway_heading = rwy['heading'] if rwy else 0
     else:
         runway, runway_heading = select_runway(metar, airfield_data, 'OEKF')
     
@@ -2343,16 +3039,16 @@ def main():
 
     phase_end = _now + timedelta(minutes=args.local_lookahead)
 
+    # Both OEKF views share the now → +local_lookahead window: apply the
+    # time filter once, then split by source.
+    local_collection = collection.filter(window_start=_now, window_end=phase_end)
+
     # OEKF phase: METAR + WARNING + PIREP only, now → +local_lookahead
-    phase_collection = collection.filter(
-        window_start=_now, window_end=phase_end, sources=PHASE_SOURCES
-    )
+    phase_collection = local_collection.filter(sources=PHASE_SOURCES)
     phase_resolved = phase_collection.resolve(runway_heading=runway_heading)
 
     # OEKF full weather (incl TAF): now → +local_lookahead — for alternate requirement check
-    oekf_full_collection = collection.filter(
-        window_start=_now, window_end=phase_end, sources=ALTERNATE_SOURCES
-    )
+    oekf_full_collection = local_collection.filter(sources=ALTERNATE_SOURCES)
     oekf_full_resolved = oekf_full_collection.resolve(runway_heading=runway_heading)
 
     # Alternate airfield window: now → +180min (used for alternate airfield assessment only)
@@ -2379,28 +3075,24 @@ def main():
     
     # Check if alternate required — using OEKF full weather (incl TAF), now → +local_lookahead
     alternate_required = False
-    warnings = []
+    warnings: List[Tuple[str, dict]] = []  # (code, params), see _WARN_FMT
     
     # OEKF conditions including TAF within the local lookahead window
     oekf_vis_m = oekf_full_resolved.get('visibility_m')
     oekf_vis_km = oekf_vis_m / 1000 if oekf_vis_m else None
-    oekf_ceiling = None
-    for c in oekf_full_resolved.get('clouds', []):
-        if c['coverage'] in ('BKN', 'OVC'):
-            oekf_ceiling = c['height_ft']
-            break
+    oekf_ceiling = _cloud_summary(oekf_full_resolved.get('clouds', []))[2]
     
     if oekf_vis_km is not None and oekf_vis_km < 5:
         alternate_required = True
-        warnings.append(f"OEKF visibility below VFR minimums ({oekf_vis_km:.1f}km)")
+        warnings.append(('oekf_vis_low', {'km': oekf_vis_km}))
     
     if oekf_ceiling is not None and oekf_ceiling < 1500:
         alternate_required = True
-        warnings.append(f"OEKF ceiling below VFR minimums ({oekf_ceiling}ft)")
+        warnings.append(('oekf_ceiling_low', {'ft': oekf_ceiling}))
     
     if oekf_full_resolved.get('has_cb'):
         alternate_required = True
-        warnings.append("OEKF CB/TS reported or forecast")
+        warnings.append(('oekf_cb', {}))
     
     # Bird-Strike Risk Level (LOP 5-13)
     # UNRESTRICTED and RESTRICTED imply solo cadets — cannot be phased when birds > LOW.
@@ -2415,8 +3107,7 @@ def main():
                      'weather_phase': weather_phase}
         
         # Cap phase at VFR — solo phases cannot be declared when birds > LOW
-        solo_phases = ['UNRESTRICTED', 'RESTRICTED', 'FS VFR']
-        if weather_phase in solo_phases:
+        if weather_phase in _SOLO_PHASES:
             phase_result['phase'] = 'VFR'
             phase_result['restrictions'] = {
                 'solo_cadets': False,
@@ -2437,7 +3128,7 @@ def main():
                 'No formation wing take-offs',
                 'No solo cadet take-offs'
             ]
-            warnings.append(f'🐦 Bird-Strike Risk: MODERATE — phase capped at VFR, no solo ops')
+            warnings.append(('bird_moderate', {}))
             
         elif bird_level == 'SEVERE':
             bird_info['restrictions'] = [
@@ -2447,14 +3138,14 @@ def main():
                 'Divert aircraft as required (fuel permitting)'
             ]
             phase_result['restrictions']['note'] = 'SEVERE BIRDS: No take-offs. Single aircraft straight-in recovery only.'
-            warnings.append(f'🐦 Bird-Strike Risk: SEVERE — NO TAKE-OFFS, straight-in recovery only')
+            warnings.append(('bird_severe', {}))
     
     # --- AIRFIELD SERVICES (LOP 5-11, Table 5-5) ---
     phase_before_services = phase_result['phase']
     notices_text = ' '.join(args.notices) if args.notices else ''
     service_impacts = analyze_service_impacts(notices_text)
     service_warnings = apply_service_impacts(service_impacts, phase_result)
-    warnings.extend(service_warnings)
+    warnings.extend(('service', {'text': w}) for w in service_warnings)
 
     # Stash service impacts on phase_result for display
     if service_impacts:
@@ -2463,18 +3154,18 @@ def main():
     
     # Warning text is shown in warnings list (already parsed by pipeline)
     if args.warning:
-        warnings.append(f"Weather warning: {args.warning}")
+        warnings.append(('weather_warning', {'text': args.warning}))
     
     # Sortie time window analysis
     sortie_window = None
     if args.sortie_time and taf:
         try:
             st = args.sortie_time.strip()
-            if len(st) == 4 and st.isdigit():
-                local_hour = int(st[:2])
-                local_min = int(st[2:])
-                # Saudi Arabia = UTC+3
-                utc_hour = (local_hour - 3) % 24
+            m = _HHMM_RE.match(st)
+            if m:
+                local_hour = int(m.group(1))
+                local_min = int(m.group(2))
+                utc_hour = (local_hour - UTC_OFFSET_HOURS) % 24
                 
                 sortie_window = taf.get_sortie_window_conditions(utc_hour)
                 if sortie_window.get('applicable'):
@@ -2487,9 +3178,9 @@ def main():
                     
                     # Flag deterioration as warning
                     if sortie_window.get('deteriorating'):
-                        warnings.append(f"📅 Conditions expected to deteriorate during sortie window ({st}L)")
+                        warnings.append(('sortie_deteriorating', {'time': st}))
                     if sortie_window.get('has_cb'):
-                        warnings.append(f"📅 CB forecast during sortie window ({st}L)")
+                        warnings.append(('sortie_cb', {'time': st}))
                         alternate_required = True
             else:
                 print(f"Warning: Invalid --sortie-time format '{st}', expected HHmm", file=sys.stderr)
@@ -2500,13 +3191,8 @@ def main():
     notam_results = None
     if not args.no_notams:
         try:
-            script_dir = Path(__file__).parent
-            if str(script_dir) not in sys.path:
-                sys.path.insert(0, str(script_dir))
-            from notam_checker import (check_notams_for_alternates, format_notam_report,
-                                       get_notam_impact_on_alternate)
             alt_icaos = airfield_data.get('alternate_priority', [])
-            notam_results = check_notams_for_alternates(alt_icaos, timeout=15)
+            notam_results = _notam_module().check_notams_for_alternates(alt_icaos, timeout=15)
         except Exception as e:
             print(f"Warning: NOTAM check failed: {e}", file=sys.stderr)
     
@@ -2516,149 +3202,91 @@ def main():
     
     if alternate_required:
         priority = airfield_data.get('alternate_priority', [])
-        
-        for icao in priority:
-            # Fetch TAF for alternate (try ICAO aliases if primary empty)
-            aliases = airfield_data.get(icao, {}).get('icao_aliases', [])
-            use_cache = not args.no_cache
-            alt_taf_str = fetch_taf(icao, aliases=aliases, use_cache=use_cache)
-            alt_taf = TAFParser(alt_taf_str) if alt_taf_str else None
-            
-            # Get NOTAM impact for this alternate (if available)
-            notam_impact = None
-            if notam_results and notam_results.get('status') == 'ok':
-                try:
-                    notam_impact = get_notam_impact_on_alternate(icao, notam_results)
-                except Exception:
-                    pass
-            
-            suitability = check_alternate_suitability(
-                icao, alt_taf_str, airfield_data, 
-                metar.wind_dir, metar.get_effective_wind_speed(),
-                use_cache=use_cache,
-                notam_impact=notam_impact
-            )
-            
-            # Apply NOTAM-level disqualifiers (AD closed, all runways closed)
-            if notam_impact:
-                try:
-                    if not notam_impact['suitable']:
-                        suitability['suitable'] = False
-                        suitability['reasons'] = suitability.get('reasons', [])
-                        suitability['reasons'].insert(0, 'NOTAM: Aerodrome closed')
-                    
-                    if notam_impact.get('closed_runways'):
-                        ad_rwys = [r['id'] for r in airfield_data.get(icao, {}).get('runways', [])]
-                        closed = notam_impact['closed_runways']
-                        closed_ids = set()
-                        for cr in closed:
-                            for part in cr.split('/'):
-                                closed_ids.add(part.strip())
-                        all_closed = all(r in closed_ids for r in ad_rwys) if ad_rwys else False
-                        
-                        if all_closed and ad_rwys:
-                            suitability['suitable'] = False
-                            suitability['reasons'] = suitability.get('reasons', [])
-                            suitability['reasons'].insert(0, f"NOTAM: All runways closed ({', '.join(closed)})")
-                        
-                        for cr in closed:
-                            suitability['warnings'].append(f"NOTAM: RWY {cr} closed")
-                    
-                    if notam_impact.get('bird_activity'):
-                        suitability['warnings'].append('NOTAM: Bird activity reported')
-                except Exception:
-                    pass
-            
-            # Calculate fuel
-            fuel_lbs, fuel_explanation = calculate_divert_fuel(
-                icao, airfield_data, 
-                solo=args.solo, 
-                opposite=args.opposite,
-                oekf_metar=metar,
-                alt_taf=alt_taf
-            )
-            
-            alt_result = {
-                'icao': icao,
-                'name': airfield_data[icao]['name'],
-                'suitable': suitability['suitable'],
-                'runway': suitability.get('runway'),
-                'crosswind': suitability.get('crosswind'),
-                'tailwind': suitability.get('tailwind'),
-                'approach': suitability.get('approach'),
-                'fuel_lbs': fuel_lbs,
-                'fuel_explanation': fuel_explanation,
-                'reasons': suitability.get('reasons', []),
-                'warnings': suitability.get('warnings', []),
-                'taf_raw': alt_taf_str,
-            }
-            
-            checked_alternates.append(alt_result)
-            
-            if suitability['suitable'] and not best_alternate:
-                best_alternate = alt_result
+        if priority:
+            checked_alternates, best_alternate = check_alternates(
+                priority, airfield_data, metar, _notam_impacts(priority, notam_results),
+                use_cache=not args.no_cache, solo=args.solo, opposite=args.opposite)
     
     # Output
     if args.json:
         json_output = {
             'phase': phase_result['phase'],
             'conditions': phase_result['conditions'],
-            'restrictions': phase_result.get('restrictions', {}),
-            'reasons': phase_result.get('reasons', []),
-            'checks': phase_result.get('checks', {}),
+            # determine_phase() always fills these; no fallback containers needed
+            'restrictions': phase_result['restrictions'],
+            'reasons': phase_result['reasons'],
+            'checks': phase_result['checks'],
             'runway': runway,
             'alternate_required': alternate_required,
             'best_alternate': best_alternate,
             'checked_alternates': checked_alternates,
-            'warnings': warnings,
+            'warnings': _render_warnings(warnings),
             'bird_risk_level': bird_level,
             'bird_info': bird_info,
             'sortie_window': sortie_window,
             'notams': notam_results,
             'notices': args.notices or []
         }
-        print(json.dumps(json_output, indent=2))
+        # Stream straight to stdout rather than building the whole document
+        json.dump(json_output, sys.stdout, indent=2, default=_json_default)
+        sys.stdout.write('\n')
     else:
         output = format_output(
             phase_result, metar, runway, alternate_required,
             checked_alternates=checked_alternates,
             best_alternate=best_alternate,
             taf=taf,
-            warnings=warnings if warnings else None,
+            warnings=_render_warnings(warnings) if warnings else None,
             show_checks=True,
             bird_info=bird_info,
             sortie_window=sortie_window,
             parse_warnings=warning_issues if warning_issues else None,
             verbose=args.verbose,
-            element_pipeline=element_pipeline
+            element_pipeline=element_pipeline,
+            zulu_now=_now
         )
+        out_parts = [output]
         # Append NOTAM results if checked
         if notam_results and notam_results.get('status') == 'ok':
-            output += "\n" + format_notam_report(notam_results) + "\n"
+            out_parts.extend(("\n", _notam_module().format_notam_report(notam_results), "\n"))
         elif notam_results and notam_results.get('status') == 'error':
-            output += f"\n⚠️  NOTAM Check: {notam_results.get('message', 'Failed')}\n"
+            out_parts.append(f"\n⚠️  NOTAM Check: {notam_results.get('message', 'Failed')}\n")
         
         # Append operational notices if provided
         if args.notices:
-            output += "\n📋 Operational Notices:"
-            for note in args.notices:
-                output += f"\n  • {note}"
-            output += "\n"
+            out_parts.append("\n📋 Operational Notices:")
+            out_parts.extend(f"\n  • {note}" for note in args.notices)
+            out_parts.append("\n")
         
         # AMSL/AGL disclaimer
         elev = airfield_data.get('OEKF', {}).get('elevation_ft', 0)
-        output += f"\n📐 Altitude Reference (OEKF elev {elev}ft AMSL):"
-        output += "\n  • LOP phase table cloud thresholds are AMSL"
-        output += f"\n    UNRESTRICTED: <8000ft AMSL = <{8000 - elev}ft AGL"
-        output += f"\n    RESTRICTED:   <6000ft AMSL = <{6000 - elev}ft AGL"
-        output += f"\n    FS VFR:       <5000ft AMSL = <{5000 - elev}ft AGL"
-        output += "\n  • METAR/TAF cloud heights are AGL (above aerodrome)"
-        output += "\n  • PIREP cloud heights are AMSL (above sea level)"
-        output += "\n  • CAVOK guarantees clear below 5000ft AGL only"
-        output += "\n"
-        
-        print(output)
-
+        out_parts.extend((
+            f"\n📐 Altitude Reference (OEKF elev {elev}ft AMSL):",
+            "\n  • LOP phase table cloud thresholds are AMSL",
+            f"\n    UNRESTRICTED: <8000ft AMSL = <{8000 - elev}ft AGL",
+            f"\n    RESTRICTED:   <6000ft AMSL = <{6000 - elev}ft AGL",
+            f"\n    FS VFR:       <5000ft AMSL = <{5000 - elev}ft AGL",
+            "\n  • METAR/TAF cloud heights are AGL (above aerodrome)",
+            "\n  • PIREP cloud heights are AMSL (above sea level)",
+            "\n  • CAVOK guarantees clear below 5000ft AGL only",
+            "\n\n",
+        ))
+        sys.stdout.write(''.join(out_parts))
 
 if __name__ == '__main__':
-    main()
+    # --profile is handled here rather than in main() so the whole run is
+    # profiled; parse it with argparse so abbreviations (--prof) work as in main()
+    _profile_parser = argparse.ArgumentParser(add_help=False)
+    _profile_parser.add_argument('--profile', action='store_true')
+    if _profile_parser.parse_known_args()[0].profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            main()
+        finally:
+            profiler.disable()
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(30)
+    else:
+        main()
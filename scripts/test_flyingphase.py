@@ -5,19 +5,22 @@ Tests METARParser, TAFParser, wind component calculations, phase determination,
 and bird level phase capping.
 """
 
+import copy
 import json
 import math
 import os
 import sys
+import time
 import unittest
 from pathlib import Path
 
 # Import from flyingphase.py
 sys.path.insert(0, str(Path(__file__).parent))
 from flyingphase import (
-    METARParser, TAFParser,
-    calculate_wind_components, determine_phase, select_runway,
-    _is_ils_available, analyze_service_impacts, apply_service_impacts
+    METARParser, TAFParser, calculate_wind_components,
+    determine_phase, select_runway, _best_runway_idx,
+    _is_ils_available, analyze_service_impacts, apply_service_impacts,
+    load_airfield_data
 )
 from weather_elements import (
     WeatherCollection, parse_metar_elements, parse_warning_elements,
@@ -71,6 +74,19 @@ class TestMETARParserStandard(unittest.TestCase):
         self.assertEqual(m.clouds[1]['height_ft'], 2500)
         self.assertEqual(m.get_ceiling_ft(), 1500)
 
+    def test_cloud_layers_sorted_by_height(self):
+        """Out-of-order layers: ceiling is the lowest BKN/OVC, not the first listed."""
+        m = METARParser("OEKF 310600Z 33012KT 9999 BKN040 FEW020 BKN015 22/10 Q1018")
+        self.assertEqual([c['height_ft'] for c in m.clouds], [1500, 2000, 4000])
+        self.assertEqual(m.get_ceiling_ft(), 1500)
+        self.assertEqual(m.get_lowest_cloud_ft(), 1500)
+
+    def test_taf_overlay_keeps_broken_layer_above_scattered(self):
+        """A TAF BKN layer is not 'covered' by a lower METAR SCT layer."""
+        m = METARParser("OEKF 310600Z 33012KT 9999 SCT010 22/10 Q1018")
+        m.apply_taf_overlay({'clouds': [{'coverage': 'BKN', 'height_ft': 2000, 'type': None}]})
+        self.assertEqual(m.get_ceiling_ft(), 2000)
+
     def test_cb_in_cloud(self):
         m = METARParser("OEKF 310600Z 33012KT 5000 BKN010CB 22/10 Q1018")
         self.assertTrue(m.has_cb())
@@ -527,6 +543,18 @@ class TestAMSLCloudThresholds(unittest.TestCase):
         result = self._phase("OEKF 310600Z 33008KT CAVOK 22/10 Q1018")
         self.assertEqual(result['phase'], 'RESTRICTED')
 
+    def test_cavok_guarantee_limits_only_max_few_check(self):
+        """At a sea-level field RESTRICTED's layer limit (6000ft AGL) is above the
+        CAVOK 5000ft AGL guarantee, but only UNRESTRICTED's 'Max FEW' check
+        treats the unseen sky as failing; 'Max SCT' still passes with no clouds."""
+        airfield_data = copy.deepcopy(self.airfield_data)
+        airfield_data['OEKF']['elevation_ft'] = 0
+        m, resolved = _metar_to_resolved("OEKF 310600Z 33008KT CAVOK 22/10 Q1018")
+        result = determine_phase(resolved, 330, airfield_data,
+                                  temp=m.temp, cavok=m.cavok, nsc=m.nsc)
+        self.assertIn(('Max FEW above 8000ft AMSL', False), result['checks']['UNRESTRICTED'])
+        self.assertIn(('Max SCT above 6000ft AMSL', True), result['checks']['RESTRICTED'])
+
     def test_cavok_satisfies_fs_vfr(self):
         """CAVOK guarantees clear below 5000ft AGL > 2600ft AGL (5000ft AMSL).
         FS VFR satisfied (wind permitting)."""
@@ -603,6 +631,11 @@ class TestTAFParser(unittest.TestCase):
         self.assertEqual(tempo['valid_from_utc'], 16)
         self.assertEqual(tempo['valid_to_utc'], 20)
 
+    def test_period_weather_ignores_icao_letters(self):
+        """OEGS must not read as GS (small hail); VCSH still yields SH."""
+        taf = TAFParser("TAF OEGS 310500Z 3106/3124 33010KT 9999 VCSH FEW040")
+        self.assertEqual(taf.base_period['weather'], ['SH'])
+
     def test_fm_period(self):
         taf = TAFParser(
             "TAF OEKF 310500Z 3106/3124 33010KT 8000 SCT040 "
@@ -662,6 +695,17 @@ class TestTAFParser(unittest.TestCase):
         self.assertIn('BASE', types)
         self.assertIn('FM', types)
 
+    def test_periods_and_deterioration_memoized(self):
+        taf = TAFParser(
+            "TAF OEKF 310500Z 3106/3124 33010KT 8000 SCT040 "
+            "TEMPO 3110/3114 3000 BKN012"
+        )
+        self.assertIs(taf.get_all_periods(), taf.get_all_periods())
+        first = taf.check_deterioration()
+        self.assertTrue(first[0])
+        self.assertIs(taf.check_deterioration(), first)
+        self.assertFalse(taf.check_deterioration(vis_limit_m=1000, ceiling_limit_ft=500)[0])
+
     def test_sortie_window_base_only(self):
         taf = TAFParser(
             "TAF OEKF 310500Z 3106/3124 33010KT 8000 SCT040"
@@ -683,6 +727,14 @@ class TestTAFParser(unittest.TestCase):
         self.assertTrue(result['has_cb'])
         self.assertTrue(result['deteriorating'])
 
+    def test_period_ceiling_precomputed(self):
+        taf = TAFParser(
+            "TAF OEKF 310500Z 3106/3124 33010KT 8000 FEW020 BKN040 OVC080 "
+            "TEMPO 3116/3120 3000 SCT010"
+        )
+        self.assertEqual(taf.base_period['ceiling_ft'], 4000)
+        self.assertIsNone(taf.tempo_periods[0]['ceiling_ft'])
+
 
 class TestBirdLevelPhaseCapping(unittest.TestCase):
     """Test bird-strike risk level phase capping."""
@@ -790,6 +842,30 @@ class TestRunwaySelection(unittest.TestCase):
         self.assertIn('15', rwy)
         self.assertEqual(hdg, 150)
 
+    def test_best_runway_idx_wraps_north(self):
+        """Wind 010° is closer to 330° than 150°; ties go to the first runway."""
+        self.assertEqual(_best_runway_idx((150, 330), 10), 1)
+        self.assertEqual(_best_runway_idx((330, 330), 330), 0)
+        self.assertIsNone(_best_runway_idx((150,), 330))
+
+    def test_select_runway_sees_edited_headings(self):
+        """Editing a heading in place changes the pick; nothing is cached on the config."""
+        data = copy.deepcopy(self.airfield_data)
+        m = METARParser("OEKF 310600Z 33012KT 9999 FEW080 22/10 Q1018")
+        select_runway(m, data, 'OEKF')
+        for rwy in data['OEKF']['runways']:
+            rwy['heading'] = (rwy['heading'] + 180) % 360
+        rwy, hdg = select_runway(m, data, 'OEKF')
+        self.assertIn('15', rwy)
+        self.assertEqual(hdg, 330)
+        self.assertFalse([k for k in data['OEKF'] if k.startswith('_')])
+
+    def test_loaded_airfields_carry_no_runway_index(self):
+        """load_airfield_data() leaves the config free of private index keys."""
+        data = load_airfield_data(Path(__file__).parent / 'airfield_data.json')
+        for icao, af in data.get('airfields', {}).items():
+            self.assertFalse([k for k in af if k.startswith('_')], icao)
+
 
 # ===================== NOTAM Checker Tests =====================
 
@@ -1292,6 +1368,25 @@ class TestWeatherElementPipeline(unittest.TestCase):
         self.assertIsNotNone(phase_vis, "Phase visibility not found in output")
         self.assertIn('10000m', phase_vis, f"Phase vis should be 10000m (METAR), got: {phase_vis}")
 
+    def test_json_output_serialises_weather_set(self):
+        """--json writes weather sets as lists and warnings as rendered strings."""
+        import subprocess
+        from datetime import datetime, timezone
+        now = datetime.now(timezone.utc)
+        result = subprocess.run(
+            [sys.executable, str(Path(__file__).parent / 'flyingphase.py'),
+             f'OEKF {now:%d%H%M}Z 33012KT 9999 -RA BR FEW080 22/10 Q1018',
+             f'TAF OEKF {now:%d%H}00Z {now:%d%H}/{now:%d}24 33010KT 9999 FEW080',
+             '--json', '--no-notams', '--bird', 'moderate'],
+            capture_output=True, text=True, timeout=15
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        data = json.loads(result.stdout)
+        self.assertIsInstance(data['conditions']['weather'], list)
+        self.assertEqual(data['conditions']['weather'], sorted(data['conditions']['weather']))
+        self.assertNotIn('warning_details', data)
+        self.assertTrue(any('MODERATE' in w for w in data['warnings']))
+
 
 class TestInputAutoClassification(unittest.TestCase):
     """Test auto-classification of METAR / TAF / PIREP inputs."""
@@ -1445,5 +1540,96 @@ class TestServiceImpacts(unittest.TestCase):
         self.assertTrue(len(warnings) > 0)
 
 
+
+class TestTAFCache(unittest.TestCase):
+    """Test the on-disk TAF cache (raw text + parsed sidecar)."""
+
+    TAF = ("TAF OEJD 310500Z 3106/3124 33010KT 8000 SCT040 "
+           "TEMPO 3116/3120 3000 TSRA BKN010CB")
+
+    def setUp(self):
+        import tempfile
+        import flyingphase
+        self._fp = flyingphase
+        self._tmp = tempfile.TemporaryDirectory()
+        self._orig_dir = flyingphase.TAF_CACHE_DIR
+        flyingphase.TAF_CACHE_DIR = self._tmp.name
+        flyingphase._TAF_MEM_CACHE.clear()
+        flyingphase._TAF_PARSED_MEM_CACHE.clear()
+
+    def tearDown(self):
+        self._fp.TAF_CACHE_DIR = self._orig_dir
+        self._fp._TAF_MEM_CACHE.clear()
+        self._fp._TAF_PARSED_MEM_CACHE.clear()
+        self._tmp.cleanup()
+
+    def test_parsed_round_trip(self):
+        taf = TAFParser(self.TAF)
+        rebuilt = TAFParser.from_dict(json.loads(json.dumps(taf.to_dict())))
+        self.assertEqual(rebuilt.get_all_periods(), taf.get_all_periods())
+        self.assertEqual(rebuilt.icao, 'OEJD')
+
+    def test_parsed_sidecar_reused(self):
+        self._fp._write_taf_cache('OEJD', self.TAF)
+        cached = self._fp._read_parsed_taf_cache('OEJD', self.TAF)
+        self.assertIsNotNone(cached)
+        self.assertTrue(cached.tempo_periods[0]['has_cb'])
+
+    def test_raw_cache_served_from_memory(self):
+        self._fp._write_taf_cache('OEJD', self.TAF)
+        os.remove(self._fp._taf_cache_path('OEJD'))
+        self.assertEqual(self._fp._read_taf_cache('oejd'), self.TAF)
+
+    def test_expired_entry_kept_for_etag_revalidation(self):
+        self._fp._write_taf_cache('OEJD', self.TAF, etag='"abc123"')
+        old = time.time() - 2 * self._fp.TAF_CACHE_EXPIRY_SECS
+        os.utime(self._fp._taf_cache_path('OEJD'), (old, old))
+        self._fp._TAF_MEM_CACHE.clear()
+        self.assertIsNone(self._fp._read_taf_cache('OEJD'))
+        self.assertEqual(self._fp._read_stale_taf_cache('OEJD'), (self.TAF, '"abc123"'))
+        # 304 Not Modified → entry is fresh again
+        self._fp._refresh_taf_cache('OEJD', self.TAF)
+        self._fp._TAF_MEM_CACHE.clear()
+        self.assertEqual(self._fp._read_taf_cache('OEJD'), self.TAF)
+
+    def test_parsed_sidecar_ignored_when_taf_changes(self):
+        self._fp._write_taf_cache('OEJD', self.TAF)
+        newer = "TAF OEJD 311100Z 3112/3212 36008KT 9999 FEW040"
+        self.assertIsNone(self._fp._read_parsed_taf_cache('OEJD', newer))
+        taf = self._fp.parse_taf_cached('OEJD', newer)
+        self.assertEqual(taf.base_period['wind_dir'], 360)
+
+    def test_parsed_sidecar_ignored_on_schema_mismatch(self):
+        self._fp._write_taf_cache('OEJD', self.TAF)
+        path = self._fp._taf_parsed_cache_path('OEJD')
+        with open(path) as f:
+            data = json.load(f)
+        del data['schema']  # written before the sidecar was versioned
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        self.assertIsNone(self._fp._read_parsed_taf_cache('OEJD', self.TAF))
+
+    def test_fetch_prefers_primary_icao_over_alias(self):
+        """A faster alias answer doesn't displace the primary ICAO's TAF."""
+        def fake_get(url, timeout=5, etag=None):
+            if 'OEXX' in url:
+                return 200, "TAF OEXX 310500Z 3106/3124 36005KT 9999 SKC", None
+            time.sleep(0.05)
+            return 200, self.TAF, None
+        orig = self._fp._http_get
+        self._fp._http_get = fake_get
+        try:
+            taf = self._fp.fetch_taf('OEJD', aliases=['OEXX'], use_cache=False)
+        finally:
+            self._fp._http_get = orig
+        self.assertEqual(taf, self.TAF)
+
+    def test_parsed_taf_shared_within_process(self):
+        taf = self._fp.parse_taf_cached('OEJD', self.TAF, use_cache=False)
+        self.assertIs(self._fp.parse_taf_cached('oejd', self.TAF, use_cache=False), taf)
+        newer = "TAF OEJD 311100Z 3112/3212 36008KT 9999 FEW040"
+        self.assertIsNot(self._fp.parse_taf_cached('OEJD', newer), taf)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
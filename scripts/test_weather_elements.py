@@ -311,6 +311,14 @@ class TestParseWarningElements(unittest.TestCase):
         self.assertEqual(len(wind), 1)
         self.assertEqual(wind[0].value['speed'], 35)
 
+    def test_vis_keyword_pattern_outranks_earlier_match(self):
+        """A VIS-prefixed value wins over an earlier lower-priority '800M VISIBILITY'."""
+        els = parse_warning_elements("800M VISIBILITY 500M, 40KT WIND")
+        vis = [el for el in els if el.type == 'visibility']
+        wind = [el for el in els if el.type == 'wind']
+        self.assertEqual(vis[0].value['meters'], 500)
+        self.assertEqual(wind[0].value['speed'], 40)
+
     def test_empty_warning(self):
         els = parse_warning_elements("")
         self.assertEqual(len(els), 0)
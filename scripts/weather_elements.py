@@ -23,6 +23,7 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Set, Dict, Tuple
 import math
 import re
+from operator import itemgetter
 
 
 # Coverage ranking for cloud conflict resolution (OVC ≈ BKN)
@@ -36,6 +37,32 @@ ALTERNATE_SOURCES = {'METAR', 'TAF', 'WARNING', 'PIREP'}
 DEFAULT_LOCAL_LOOKAHEAD = 60
 DEFAULT_ALTERNATE_LOOKAHEAD = 180
 
+# Warning / PIREP text tokens that flag CB / thunderstorm activity
+_WARNING_CB_RE = re.compile(r'\bCB\b|\bTS\b|THUNDERSTORM')
+
+# Free-text visibility, tried in order (warnings, and PIREPs without /FV).
+# Optional filler between VIS and number: BELOW, REDUCING, REDUCING TO, DOWN TO, OF, <
+_VIS_FILLER = r'(?:(?:REDUCING\s+TO|REDUCING|DOWN\s+TO|BELOW|OF|<)\s+)?'
+_FREE_TEXT_VIS_RES = tuple(re.compile(p) for p in (
+    r'VIS(?:IBILITY)?\s+' + _VIS_FILLER + r'(\d+)\s*(?:M(?:ETERS?)?|OR\s+LESS)',
+    r'VIS(?:IBILITY)?\s+' + _VIS_FILLER + r'(\d+(?:\.\d+)?)\s*KM',
+    r'VIS(?:IBILITY)?\s+' + _VIS_FILLER + r'(\d+)\b',
+    r'(\d+)\s*(?:M\b|METERS?)\s+(?:OR\s+LESS|VISIBILITY)',
+    r'\b(\d+)\s*KM\b',  # bare "7KM"
+))
+# Bare 4-digit METAR-style visibility (e.g. "SKC 7000")
+_BARE_VIS_RE = re.compile(r'(?<!\d)(\d{4})(?!\d)')
+_WARNING_WIND_RES = tuple(re.compile(p) for p in (
+    r'(?:WIND|GUST)S?\s+(?:EXCEEDING\s+|ABOVE\s+|>?\s*)(\d+)\s*(?:KT|KNOTS?)?',
+    r'(\d+)\s*(?:KT|KNOTS?)\s+(?:WIND|GUST)',
+))
+# METAR-style cloud groups (e.g. "BKN020", "OVC010CB", "FEW050")
+_CLOUD_GROUP_RE = re.compile(r'\b(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?\b')
+_PIREP_SK_RE = re.compile(r'/SK\s+([A-Z0-9\s]+?)(?=/|$)')
+_PIREP_SK_CLOUD_RE = re.compile(r'(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?')
+_PIREP_WX_RE = re.compile(r'/WX\s+([A-Z\s+\-]+?)(?=/|$)')
+_PIREP_FV_RE = re.compile(r'/FV\s+(\d+)\s*(SM|KM|M)?')
+
 
 @dataclass
 class WeatherElement:
@@ -154,7 +181,7 @@ class WeatherCollection:
             if h not in by_height or rank > COVERAGE_RANK.get(by_height[h]['coverage'], 0):
                 by_height[h] = dict(el.value)
 
-        result['clouds'] = sorted(by_height.values(), key=lambda c: c['height_ft'])
+        result['clouds'] = sorted(by_height.values(), key=itemgetter('height_ft'))
 
         # CB from cloud layers
         for c in result['clouds']:
@@ -509,24 +536,15 @@ def parse_warning_elements(warning_text: str) -> List[WeatherElement]:
     warn_upper = warning_text.upper()
 
     # CB / TS
-    if re.search(r'\bCB\b', warn_upper) or 'THUNDERSTORM' in warn_upper or re.search(r'\bTS\b', warn_upper):
+    if _WARNING_CB_RE.search(warn_upper):
         elements.append(WeatherElement(
             type='weather', value={'code': 'CB'}, source='WARNING', raw=warning_text
         ))
 
     # Visibility
     vis_m = None
-    # Optional filler between VIS and number: BELOW, REDUCING, REDUCING TO, DOWN TO, OF, <
-    _VIS_FILLER = r'(?:(?:REDUCING\s+TO|REDUCING|DOWN\s+TO|BELOW|OF|<)\s+)?'
-    vis_patterns = [
-        r'VIS(?:IBILITY)?\s+' + _VIS_FILLER + r'(\d+)\s*(?:M(?:ETERS?)?|OR\s+LESS)',
-        r'VIS(?:IBILITY)?\s+' + _VIS_FILLER + r'(\d+(?:\.\d+)?)\s*KM',
-        r'VIS(?:IBILITY)?\s+' + _VIS_FILLER + r'(\d+)\b',
-        r'(\d+)\s*(?:M\b|METERS?)\s+(?:OR\s+LESS|VISIBILITY)',
-        r'\b(\d+)\s*KM\b',  # bare "7KM"
-    ]
-    for vp in vis_patterns:
-        vm = re.search(vp, warn_upper)
+    for vp in _FREE_TEXT_VIS_RES:
+        vm = vp.search(warn_upper)
         if vm:
             val = float(vm.group(1))
             if 'KM' in vm.group(0):
@@ -539,7 +557,7 @@ def parse_warning_elements(warning_text: str) -> List[WeatherElement]:
     # Fallback: bare 4-digit number (METAR-style vis, e.g. "SKC 7000" or just "5000")
     # Excludes wind-like patterns (3-digit direction + speed) and QNH
     if vis_m is None:
-        bare = re.search(r'(?<!\d)(\d{4})(?!\d)', warn_upper)
+        bare = _BARE_VIS_RE.search(warn_upper)
         if bare:
             val = int(bare.group(1))
             # Exclude QNH values (1000-1050 range preceded by Q)
@@ -557,12 +575,8 @@ def parse_warning_elements(warning_text: str) -> List[WeatherElement]:
         ))
 
     # Wind
-    wind_patterns = [
-        r'(?:WIND|GUST)S?\s+(?:EXCEEDING\s+|ABOVE\s+|>?\s*)(\d+)\s*(?:KT|KNOTS?)?',
-        r'(\d+)\s*(?:KT|KNOTS?)\s+(?:WIND|GUST)',
-    ]
-    for wp in wind_patterns:
-        wm = re.search(wp, warn_upper)
+    for wp in _WARNING_WIND_RES:
+        wm = wp.search(warn_upper)
         if wm:
             elements.append(WeatherElement(
                 type='wind',
@@ -572,7 +586,7 @@ def parse_warning_elements(warning_text: str) -> List[WeatherElement]:
             break
 
     # METAR-style cloud groups (e.g. "BKN020", "OVC010CB", "FEW050")
-    for cm in re.finditer(r'\b(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?\b', warn_upper):
+    for cm in _CLOUD_GROUP_RE.finditer(warn_upper):
         cb = cm.group(3) == 'CB' if cm.group(3) else False
         height_ft = int(cm.group(2)) * 100
         elements.append(WeatherElement(
@@ -612,9 +626,9 @@ def parse_pirep_elements(pirep_text: str,
     upper = pirep_text.upper()
 
     # Sky condition: /SK BKN040, /SK OVC010CB
-    sk_match = re.search(r'/SK\s+([A-Z0-9\s]+?)(?=/|$)', upper)
+    sk_match = _PIREP_SK_RE.search(upper)
     if sk_match:
-        for cm in re.finditer(r'(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?', sk_match.group(1)):
+        for cm in _PIREP_SK_CLOUD_RE.finditer(sk_match.group(1)):
             cb = cm.group(3) == 'CB' if cm.group(3) else False
             height_amsl = int(cm.group(2)) * 100
             height_agl = max(0, height_amsl - elevation_ft)  # PIREP is AMSL → convert to AGL
@@ -626,7 +640,7 @@ def parse_pirep_elements(pirep_text: str,
             ))
 
     # Weather: /WX TS, /WX BLDU
-    wx_match = re.search(r'/WX\s+([A-Z\s+\-]+?)(?=/|$)', upper)
+    wx_match = _PIREP_WX_RE.search(upper)
     if wx_match:
         for code in wx_match.group(1).strip().split():
             code = code.strip('+-')
@@ -637,7 +651,7 @@ def parse_pirep_elements(pirep_text: str,
                 ))
 
     # Flight visibility: /FV 3SM, /FV 5000M
-    fv_match = re.search(r'/FV\s+(\d+)\s*(SM|KM|M)?', upper)
+    fv_match = _PIREP_FV_RE.search(upper)
     if fv_match:
         val = int(fv_match.group(1))
         unit = fv_match.group(2) or ''
@@ -655,16 +669,8 @@ def parse_pirep_elements(pirep_text: str,
     # Fallback: no /FV — try VIS/VISIBILITY patterns (same as warning parser)
     has_vis = any(el.type == 'visibility' for el in elements)
     if not has_vis and not fv_match:
-        _VIS_F = r'(?:(?:REDUCING\s+TO|REDUCING|DOWN\s+TO|BELOW|OF|<)\s+)?'
-        vis_patterns_fallback = [
-            r'VIS(?:IBILITY)?\s+' + _VIS_F + r'(\d+)\s*(?:M(?:ETERS?)?|OR\s+LESS)',
-            r'VIS(?:IBILITY)?\s+' + _VIS_F + r'(\d+(?:\.\d+)?)\s*KM',
-            r'VIS(?:IBILITY)?\s+' + _VIS_F + r'(\d+)\b',
-            r'(\d+)\s*(?:M\b|METERS?)\s+(?:OR\s+LESS|VISIBILITY)',
-            r'\b(\d+)\s*KM\b',
-        ]
-        for vp in vis_patterns_fallback:
-            vm = re.search(vp, upper)
+        for vp in _FREE_TEXT_VIS_RES:
+            vm = vp.search(upper)
             if vm:
                 val = float(vm.group(1))
                 if 'KM' in vm.group(0):
@@ -680,7 +686,7 @@ def parse_pirep_elements(pirep_text: str,
     # Fallback: no /FV and no VIS — try bare 4-digit vis (METAR-style, e.g. "SKC 7000")
     has_vis = any(el.type == 'visibility' for el in elements)
     if not has_vis and not fv_match:
-        bare = re.search(r'(?<!\d)(\d{4})(?!\d)', upper)
+        bare = _BARE_VIS_RE.search(upper)
         if bare:
             val = int(bare.group(1))
             prefix = upper[:bare.start()]
@@ -693,7 +699,7 @@ def parse_pirep_elements(pirep_text: str,
     # Fallback: no /SK found — try bare cloud groups (METAR-style, e.g. "BKN020 5000")
     has_clouds = any(el.type == 'cloud' for el in elements)
     if not has_clouds and not sk_match:
-        for cm in re.finditer(r'\b(FEW|SCT|BKN|OVC)(\d{3})(CB|TCU)?\b', upper):
+        for cm in _CLOUD_GROUP_RE.finditer(upper):
             cb = cm.group(3) == 'CB' if cm.group(3) else False
             height_ft = int(cm.group(2)) * 100  # Bare clouds treated as AGL (like METAR)
             elements.append(WeatherElement(
@@ -704,7 +710,7 @@ def parse_pirep_elements(pirep_text: str,
             ))
 
     # CB anywhere in PIREP
-    if re.search(r'\bCB\b|\bTS\b|THUNDERSTORM', upper):
+    if _WARNING_CB_RE.search(upper):
         codes = {el.value.get('code') for el in elements if el.type == 'weather'}
         if 'CB' not in codes and 'TS' not in codes:
             elements.append(WeatherElement(